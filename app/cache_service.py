@@ -0,0 +1,69 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+from config import Config
+
+class CacheService:
+    """On-disk cache with per-entry expiry that survives reruns and restarts"""
+    
+    def __init__(self, cache_dir: str = Config.CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired"""
+        path = self._get_path(key)
+        
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache entry {key}: {e}")
+            return None
+        
+        if time.time() >= expires_at:
+            self.delete(key)
+            return None
+        
+        return value
+    
+    def set(self, key: str, value: Any, ttl: int):
+        """Cache a value for ttl seconds"""
+        path = self._get_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        try:
+            # Write to a temp file first so readers never see a partial entry
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((time.time() + ttl, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry {key}: {e}")
+    
+    def set_many(self, entries: List[Tuple[str, Any, int]]):
+        """Cache several (key, value, ttl) entries in one pass"""
+        for key, value, ttl in entries:
+            self.set(key, value, ttl)
+    
+    def delete(self, key: str):
+        """Remove a cached value"""
+        try:
+            os.remove(self._get_path(key))
+        except OSError:
+            pass
+    
+    def _get_path(self, key: str) -> str:
+        """Map a cache key to its file path"""
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+@lru_cache(maxsize=1)
+def get_cache_service() -> CacheService:
+    """Shared CacheService so every service instance reuses one store per process"""
+    return CacheService()
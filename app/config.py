@@ -1,22 +1,32 @@
 import os
+from typing import Final
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 class Config:
-    """Configuration class for the application"""
+    """Configuration class for the application; values are parsed once at import"""
     
     # Cache Configuration
-    YAHOO_FINANCE_CACHE_TTL = int(os.getenv('YAHOO_FINANCE_CACHE_TTL', 300))  # 5 minutes
-    MAX_CACHE_SIZE = int(os.getenv('MAX_CACHE_SIZE', 1000))
-    CACHE_EXPIRY = int(os.getenv('CACHE_EXPIRY', 3600))  # 1 hour
+    YAHOO_FINANCE_CACHE_TTL: Final[int] = int(os.getenv('YAHOO_FINANCE_CACHE_TTL', 300))  # 5 minutes
+    MAX_CACHE_SIZE: Final[int] = int(os.getenv('MAX_CACHE_SIZE', 1000))
+    CACHE_EXPIRY: Final[int] = int(os.getenv('CACHE_EXPIRY', 3600))  # 1 hour
+    HISTORY_CACHE_TTL: Final[int] = int(os.getenv('HISTORY_CACHE_TTL', 604800))  # 1 week; stale entries are topped up incrementally
+    PROFILE_CACHE_TTL: Final[int] = int(os.getenv('PROFILE_CACHE_TTL', 2592000))  # 30 days
+    CACHE_DIR: Final[str] = os.getenv('CACHE_DIR', '.cache')
+    PORTFOLIO_DB_PATH: Final[str] = os.getenv('PORTFOLIO_DB_PATH', os.path.join(CACHE_DIR, 'portfolios.db'))
+    SESSION_PORTFOLIO_TTL: Final[int] = int(os.getenv('SESSION_PORTFOLIO_TTL', 604800))  # 1 week; then a signed-out session's scenarios are pruned
+    PORTFOLIO_OWNER: Final[str] = os.getenv('PORTFOLIO_OWNER', '')  # Opt-in shared namespace for signed-out visitors; empty keeps them per session
     
     # API Configuration
-    ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', '')
-    IEX_CLOUD_API_KEY = os.getenv('IEX_CLOUD_API_KEY', '')
+    ALPHA_VANTAGE_API_KEY: Final[str] = os.getenv('ALPHA_VANTAGE_API_KEY', '')
+    IEX_CLOUD_API_KEY: Final[str] = os.getenv('IEX_CLOUD_API_KEY', '')
+    YAHOO_BATCH_SIZE: Final[int] = int(os.getenv('YAHOO_BATCH_SIZE', 10))  # Symbols per multi-ticker request
+    MAX_FETCH_WORKERS: Final[int] = int(os.getenv('MAX_FETCH_WORKERS', 8))  # Concurrent per-ticker requests
+    FETCH_TIMEOUT: Final[int] = int(os.getenv('FETCH_TIMEOUT', 15))  # Seconds to wait on one pooled request
     
     # Application Configuration
-    DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
-    HOST = os.getenv('HOST', 'localhost')
-    PORT = int(os.getenv('PORT', 8501))
+    DEBUG: Final[bool] = os.getenv('DEBUG', 'False').lower() == 'true'
+    HOST: Final[str] = os.getenv('HOST', 'localhost')
+    PORT: Final[int] = int(os.getenv('PORT', 8501))
@@ -4,108 +4,435 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import time
+import operator
+import threading
+import contextvars
 from config import Config
+from cache_service import get_cache_service
+from utils.metrics import TRADING_DAYS, SQRT_TRADING_DAYS, simple_returns, max_drawdown as compute_max_drawdown
 from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+# Bound once at import so hot cache checks read module ints, not class attributes
+_CACHE_TTL = Config.YAHOO_FINANCE_CACHE_TTL
+_MAX_CACHE_SIZE = Config.MAX_CACHE_SIZE
+
+# Quote LRU shared by every service instance, so all pages and sessions reuse one bounded cache
+_quote_cache = OrderedDict()  # Ordered least to most recently used
+_quote_timestamps = {}
+_quote_cache_lock = threading.Lock()
+
+# Price histories keyed by (ticker, period), bounded and locked the same way as the quotes
+_history_cache = OrderedDict()  # Ordered least to most recently used
+_history_cache_lock = threading.Lock()
+
+# Buffer of deferred disk-cache writes for the batch open in the current context; a context
+# variable keeps concurrent sessions' batches apart on the shared service
+_pending_writes = contextvars.ContextVar('pending_cache_writes', default=None)
+_pending_writes_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def get_fetch_executor() -> ThreadPoolExecutor:
+    """Shared thread pool bounding concurrent Yahoo requests across all sessions"""
+    return ThreadPoolExecutor(max_workers=Config.MAX_FETCH_WORKERS, thread_name_prefix="yahoo-fetch")
 
 class StockDataService:
     """Backend service for stock data operations - handles heavy processing"""
     
+    # (output field, info keys tried in order, default when all are missing)
+    PROFILE_FIELDS = (
+        ('company_name', ('longName', 'shortName'), None),
+        ('market_cap', ('marketCap',), 0),
+        ('pe_ratio', ('trailingPE', 'forwardPE'), 0),
+        ('pb_ratio', ('priceToBook',), 0),
+        ('dividend_yield', ('dividendYield',), 0),
+        ('sector', ('sector',), 'N/A'),
+        ('industry', ('industry',), 'N/A'),
+        ('fifty_two_week_high', ('fiftyTwoWeekHigh',), 0),
+        ('fifty_two_week_low', ('fiftyTwoWeekLow',), 0),
+        ('avg_volume', ('averageVolume',), 0)
+    )
+    # (filter key, column, comparison against the filter value) for stock screening
+    SCREEN_FILTERS = (
+        ('min_pe', 'pe_ratio', operator.ge),
+        ('max_pe', 'pe_ratio', operator.le),
+        ('min_dividend', 'dividend_yield', operator.ge),
+        ('sector', 'sector', operator.eq),
+        ('min_market_cap', 'market_cap', operator.ge),
+        ('max_market_cap', 'market_cap', operator.le)
+    )
+    
     def __init__(self):
-        self.cache = {}
-        self.cache_timestamps = {}
+        self.cache = _quote_cache
+        self.cache_timestamps = _quote_timestamps
         self.rate_limit_tracker = {}
+        self.history_cache = _history_cache
+        self.disk_cache = get_cache_service()
+        self._cache_lock = _quote_cache_lock
     
-    def get_stock_data(self, ticker: str) -> Dict:
-        """Get comprehensive stock data for a single ticker"""
+    def get_stock_data(self, ticker: str, hist: Optional[pd.DataFrame] = None) -> Dict:
+        """Get comprehensive stock data for a single ticker
+
+        ``hist`` can carry recent price history from a batched download so the
+        price fallback doesn't need its own request.
+        """
         try:
             # Check cache first
-            if self._is_cache_valid(ticker):
-                return self.cache[ticker]
+            with self._cache_lock:
+                if self._is_cache_valid(ticker):
+                    self.cache.move_to_end(ticker)
+                    return self.cache[ticker]
+                
+                # Drop an expired quote so it doesn't hold a slot until evicted
+                if self.cache.pop(ticker, None) is not None:
+                    self.cache_timestamps.pop(ticker, None)
+            
+            # Fall back to the on-disk cache shared across reruns
+            data = self.disk_cache.get(f"quote:{ticker}")
+            if data:
+                self._cache_data(ticker, data)
+                return data
             
-            # Fetch from Yahoo Finance
             stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # Better data validation and fallbacks
-            current_price = info.get('currentPrice') or info.get('regularMarketPrice') or info.get('previousClose')
-            price_change = info.get('regularMarketChange') or 0
-            price_change_percent = info.get('regularMarketChangePercent') or 0
-            
-            # If we still don't have a current price, try to get it from history
-            if not current_price or current_price == 0:
-                try:
-                    hist = stock.history(period="1d")
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        # Calculate change from previous close
-                        if len(hist) > 1:
-                            prev_close = hist['Close'].iloc[-2]
-                            price_change = current_price - prev_close
-                            price_change_percent = (price_change / prev_close) * 100
-                except Exception as e:
-                    print(f"Error getting historical data for {ticker}: {e}")
+            
+            # Company fundamentals move slowly, so only pull the full info payload
+            # when the cached profile has expired
+            profile = self.disk_cache.get(f"profile:{ticker}")
+            if profile is None:
+                profile = self._extract_fields(stock.info, self.PROFILE_FIELDS)
+                profile['company_name'] = profile['company_name'] or ticker
+                self._persist(f"profile:{ticker}", profile, Config.PROFILE_CACHE_TTL)
+            
+            # Price the quote from recent daily bars whatever the profile's cache state,
+            # so the same ticker always reports the same kind of change
+            current_price = price_change = price_change_percent = volume = 0
+            try:
+                if hist is None:
+                    hist = stock.history(period="5d")
+                if not hist.empty:
+                    current_price = hist['Close'].iloc[-1]
+                    volume = hist['Volume'].iloc[-1] if 'Volume' in hist.columns else volume
+                    # Calculate change from previous close
+                    if len(hist) > 1:
+                        prev_close = hist['Close'].iloc[-2]
+                        price_change = current_price - prev_close
+                        price_change_percent = (price_change / prev_close) * 100
+            except Exception as e:
+                print(f"Error getting historical data for {ticker}: {e}")
             
             # Process and transform data with better validation
             data = {
                 'ticker': ticker,
-                'company_name': info.get('longName') or info.get('shortName') or ticker,
+                'company_name': profile['company_name'],
                 'current_price': current_price or 0,
                 'price_change': price_change or 0,
                 'price_change_percent': price_change_percent or 0,
-                'volume': info.get('volume') or info.get('regularMarketVolume') or 0,
-                'market_cap': info.get('marketCap') or 0,
-                'pe_ratio': info.get('trailingPE') or info.get('forwardPE') or 0,
-                'pb_ratio': info.get('priceToBook') or 0,
-                'dividend_yield': info.get('dividendYield') or 0,
-                'sector': info.get('sector') or 'N/A',
-                'industry': info.get('industry') or 'N/A',
-                'fifty_two_week_high': info.get('fiftyTwoWeekHigh') or 0,
-                'fifty_two_week_low': info.get('fiftyTwoWeekLow') or 0,
-                'avg_volume': info.get('averageVolume') or 0,
+                'volume': volume or 0,
+                'market_cap': profile['market_cap'],
+                'pe_ratio': profile['pe_ratio'],
+                'pb_ratio': profile['pb_ratio'],
+                'dividend_yield': profile['dividend_yield'],
+                'sector': profile['sector'],
+                'industry': profile['industry'],
+                'fifty_two_week_high': profile['fifty_two_week_high'],
+                'fifty_two_week_low': profile['fifty_two_week_low'],
+                'avg_volume': profile['avg_volume'],
                 'last_updated': datetime.now().isoformat()
             }
             
             # Cache the result
             self._cache_data(ticker, data)
+            self._persist(f"quote:{ticker}", data, _CACHE_TTL)
             return data
             
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
-            return self._get_fallback_data(ticker)
+            # Negative-cache the miss in memory so a bad ticker isn't re-requested on every call
+            fallback = self._get_fallback_data(ticker)
+            self._cache_data(ticker, fallback)
+            return fallback
+    
+    def get_stock_data_many(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Get stock data for several tickers concurrently"""
+        if not tickers:
+            return {}
+        
+        with self.batch_cache_writes():
+            return dict(zip(tickers, self._pool_map(self.get_stock_data, tickers, self._get_fallback_data)))
+    
+    def _extract_fields(self, info: Dict, fields: Tuple) -> Dict:
+        """Pick each field from the first non-empty info key in its fallback chain"""
+        return {
+            name: next((info[key] for key in keys if info.get(key)), default)
+            for name, keys, default in fields
+        }
     
     def get_historical_data(self, ticker: str, period: str = "1y") -> pd.DataFrame:
         """Get historical price data"""
         try:
+            key = (ticker, period)
+            disk_key = f"history:{ticker}:{period}"
+            entry = self._get_history_entry(key)
+            
+            if entry is None:
+                entry = self.disk_cache.get(disk_key)
+                if entry:
+                    self._cache_history(key, entry)
+            
+            if entry and time.time() - entry['timestamp'] < _CACHE_TTL:
+                return entry['hist']
+            
             stock = yf.Ticker(ticker)
+            
+            # Only fetch bars since the last cached one and extend the indicators; work on a
+            # copy so other threads keep reading the shared entry until the new one is stored
+            if entry:
+                new_bars = stock.history(start=entry['hist'].index[-1])
+                entry = dict(entry)
+                if self._extend_history(entry, new_bars):
+                    self._cache_history(key, entry)
+                    self._persist(disk_key, entry, Config.HISTORY_CACHE_TTL)
+                    return entry['hist']
+            
             hist = stock.history(period=period)
             
             if hist.empty:
                 return pd.DataFrame()
             
             # Calculate technical indicators
-            hist['SMA_20'] = hist['Close'].rolling(window=20).mean()
-            hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
-            hist['RSI'] = self._calculate_rsi(hist['Close'])
-            hist['Volatility'] = hist['Close'].pct_change().rolling(window=20).std()
+            avg_gain, avg_loss = self._add_indicators(hist)
             
+            entry = {
+                'hist': hist,
+                'avg_gain': avg_gain,
+                'avg_loss': avg_loss,
+                'size': len(hist),
+                'timestamp': time.time()
+            }
+            self._cache_history(key, entry)
+            self._persist(disk_key, entry, Config.HISTORY_CACHE_TTL)
             return hist
             
         except Exception as e:
             print(f"Error fetching historical data for {ticker}: {e}")
             return pd.DataFrame()
     
+    def get_historical_data_many(self, tickers: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        """Get historical price data for several tickers concurrently"""
+        if not tickers:
+            return {}
+        
+        # Serve fresh in-memory histories inline; only stale or missing ones need a worker thread
+        results = {}
+        to_fetch = []
+        for ticker in dict.fromkeys(tickers):
+            entry = self._get_history_entry((ticker, period))
+            if entry and time.time() - entry['timestamp'] < _CACHE_TTL:
+                results[ticker] = entry['hist']
+            else:
+                to_fetch.append(ticker)
+        
+        if to_fetch:
+            # yfinance releases the GIL on network I/O, so threads overlap the requests
+            with self.batch_cache_writes():
+                # A stalled request costs only its own ticker, which comes back empty
+                histories = self._pool_map(
+                    lambda ticker: self.get_historical_data(ticker, period), to_fetch, lambda ticker: pd.DataFrame()
+                )
+                results.update(zip(to_fetch, histories))
+        
+        return {ticker: results[ticker] for ticker in tickers}
+    
+    def _add_indicators(self, hist: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """Calculate technical indicators over the full history, returning the RSI state"""
+        avg_gain, avg_loss = self._wilder_averages(hist['Close'])
+        
+        closes = hist['Close'].to_numpy(dtype=float)
+        returns = np.empty_like(closes)
+        returns[0] = np.nan
+        returns[1:] = closes[1:] / closes[:-1] - 1
+        
+        hist['SMA_20'], hist['SMA_50'] = self._rolling_means(closes, (20, 50))
+        hist['RSI'] = 100 - (100 / (1 + avg_gain / avg_loss))
+        hist['Volatility'] = self._rolling_std(returns, 20)
+        
+        return avg_gain, avg_loss
+    
+    def _rolling_means(self, values: np.ndarray, windows: Tuple[int, ...]) -> List[np.ndarray]:
+        """Rolling means for several windows from one shared cumulative sum, NaN until each window fills"""
+        csum = self._prefix_sums(values)
+        means = []
+        
+        for window in windows:
+            out = np.full(len(values), np.nan)
+            if len(values) >= window:
+                out[window - 1:] = (csum[window:] - csum[:-window]) / window
+            means.append(out)
+        
+        return means
+    
+    def _prefix_sums(self, values: np.ndarray) -> np.ndarray:
+        """Cumulative sum with a leading zero, written in place into one buffer"""
+        csum = np.empty(len(values) + 1)
+        csum[0] = 0.0
+        np.cumsum(values, out=csum[1:])
+        return csum
+    
+    def _rolling_std(self, values: np.ndarray, window: int) -> np.ndarray:
+        """Rolling sample std via Var = (sum(x^2) - sum(x)^2 / n) / (n - 1), leading NaNs skipped"""
+        out = np.full(len(values), np.nan)
+        start = np.argmax(~np.isnan(values)) if len(values) else 0
+        valid = values[start:]
+        
+        if len(valid) >= window:
+            csum = self._prefix_sums(valid)
+            csum_sq = self._prefix_sums(valid ** 2)
+            window_sum = csum[window:] - csum[:-window]
+            window_sum_sq = csum_sq[window:] - csum_sq[:-window]
+            variance = (window_sum_sq - window_sum ** 2 / window) / (window - 1)
+            out[start + window - 1:] = np.sqrt(np.maximum(variance, 0))
+        return out
+    
+    def _extend_history(self, entry: Dict, new_bars: pd.DataFrame, period: int = 14) -> bool:
+        """Append new bars to a cached history, updating indicators from their prior state"""
+        if new_bars.empty:
+            entry['timestamp'] = time.time()
+            return True
+        
+        # The last cached bar may be a partial day, so replace any overlap
+        keep = entry['hist'].index < new_bars.index[0]
+        hist = entry['hist'][keep]
+        avg_gain = entry['avg_gain'][keep]
+        avg_loss = entry['avg_loss'][keep]
+        
+        # Too little history to carry the indicator state, recompute instead
+        if len(hist) < 50:
+            return False
+        
+        closes = hist['Close'].tolist()
+        returns = hist['Close'].pct_change().tolist()[-20:]
+        sum_20 = sum(closes[-20:])
+        sum_50 = sum(closes[-50:])
+        gain = avg_gain.iloc[-1]
+        loss = avg_loss.iloc[-1]
+        
+        rows = {'SMA_20': [], 'SMA_50': [], 'RSI': [], 'Volatility': []}
+        gains, losses = [], []
+        
+        for price in new_bars['Close']:
+            prev_price = closes[-1]
+            delta = price - prev_price
+            
+            # Rolling sums: add the newest close, drop the one leaving the window
+            sum_20 += price - closes[-20]
+            sum_50 += price - closes[-50]
+            closes.append(price)
+            
+            # Wilder smoothing of average gain/loss
+            gain = (gain * (period - 1) + max(delta, 0)) / period
+            loss = (loss * (period - 1) + max(-delta, 0)) / period
+            gains.append(gain)
+            losses.append(loss)
+            
+            returns = returns[1:] + [price / prev_price - 1]
+            
+            rows['SMA_20'].append(sum_20 / 20)
+            rows['SMA_50'].append(sum_50 / 50)
+            rows['RSI'].append(100 - (100 / (1 + gain / loss)) if loss else 100.0)
+            rows['Volatility'].append(np.std(returns, ddof=1))
+        
+        new_bars = new_bars.assign(**rows)
+        size = entry['size']
+        
+        entry['hist'] = pd.concat([hist, new_bars]).iloc[-size:]
+        entry['avg_gain'] = pd.concat([avg_gain, pd.Series(gains, index=new_bars.index)]).iloc[-size:]
+        entry['avg_loss'] = pd.concat([avg_loss, pd.Series(losses, index=new_bars.index)]).iloc[-size:]
+        entry['timestamp'] = time.time()
+        return True
+    
+    def get_batch_history(self, tickers: List[str], period: str = "2d",
+                          start_date: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        """Get price history for many tickers with batched multi-symbol downloads, from start_date if given"""
+        histories = {}
+        batch_size = Config.YAHOO_BATCH_SIZE
+        window = {'start': start_date} if start_date else {'period': period}
+        
+        # Yahoo caps symbols per request, so download in chunks
+        for start in range(0, len(tickers), batch_size):
+            chunk = tickers[start:start + batch_size]
+            try:
+                data = yf.download(
+                    " ".join(chunk),
+                    group_by='ticker',
+                    **window,
+                    progress=False,
+                    threads=True
+                )
+            except Exception as e:
+                print(f"Error batch downloading {', '.join(chunk)}: {e}")
+                continue
+            
+            if data.empty:
+                continue
+            
+            for ticker in chunk:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    hist = data[ticker]
+                else:
+                    hist = data
+                
+                hist = hist.dropna(how='all')
+                if not hist.empty:
+                    histories[ticker] = hist
+        
+        return histories
+    
+    def get_bulk_quotes(self, tickers: List[str]) -> pd.DataFrame:
+        """Get latest price and daily change for many tickers from batched downloads"""
+        columns = ['ticker', 'current_price', 'price_change', 'price_change_percent', 'sector']
+        histories = self.get_batch_history(tickers, period="5d")
+        
+        if not histories:
+            return pd.DataFrame(columns=columns)
+        
+        # One column of closes per ticker, compared across the last two sessions
+        closes = pd.DataFrame({ticker: hist['Close'] for ticker, hist in histories.items()}).ffill()
+        if len(closes) < 2:
+            return pd.DataFrame(columns=columns)
+        
+        current = closes.iloc[-1]
+        previous = closes.iloc[-2]
+        quotes = pd.DataFrame({
+            'ticker': closes.columns,
+            'current_price': current.to_numpy(),
+            'price_change': (current - previous).to_numpy(),
+            'price_change_percent': ((current - previous) / previous * 100).to_numpy()
+        }).dropna()
+        
+        # Sector comes from any cached company profile, no extra requests
+        quotes['sector'] = [
+            (self.disk_cache.get(f"profile:{ticker}") or {}).get('sector', 'N/A')
+            for ticker in quotes['ticker']
+        ]
+        return quotes
+    
     def get_market_overview(self) -> Dict:
         """Get market overview with major indices"""
         indices = ['^GSPC', '^DJI', '^IXIC', '^RUT']  # S&P 500, Dow, Nasdaq, Russell
         overview = {}
         
+        # One batched request for all indices - don't use get_stock_data
+        histories = self.get_batch_history(indices, period="2d")
+        
         for index in indices:
             try:
-                # Direct approach for indices - don't use get_stock_data
-                stock = yf.Ticker(index)
-                hist = stock.history(period="2d")
+                hist = histories.get(index)
                 
-                if not hist.empty and len(hist) >= 2:
+                if hist is not None and len(hist) >= 2:
                     current_price = float(hist['Close'].iloc[-1])
                     prev_price = float(hist['Close'].iloc[-2])
                     change = current_price - prev_price
@@ -140,18 +467,26 @@ class StockDataService:
         popular_stocks = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX']
         screened = []
         
-        for ticker in popular_stocks:
+        # Prefetch recent prices for uncached tickers in batched requests
+        to_fetch = [ticker for ticker in popular_stocks if not self._is_cache_valid(ticker)]
+        histories = self.get_batch_history(to_fetch, period="2d")
+        
+        # Profile lookups are separate round-trips, so run them on the shared fetch pool
+        with self.batch_cache_writes():
             try:
-                data = self.get_stock_data(ticker)
-                
-                # Apply filters
-                if self._passes_filters(data, filters):
-                    screened.append(data)
-                    
+                screened = self._pool_map(
+                    lambda ticker: self.get_stock_data(ticker, histories.get(ticker)), popular_stocks,
+                    self._get_fallback_data
+                )
             except Exception as e:
-                print(f"Error screening {ticker}: {e}")
+                print(f"Error screening stocks: {e}")
         
-        return screened
+        if not screened:
+            return []
+        
+        # Apply all filters as one combined boolean mask
+        df = pd.DataFrame(screened)
+        return df[self._filter_mask(df, filters)].to_dict('records')
     
     def calculate_portfolio_metrics(self, portfolio: List[Dict]) -> Dict:
         """Calculate portfolio risk and return metrics"""
@@ -159,43 +494,48 @@ class StockDataService:
             return {}
         
         try:
-            # Calculate portfolio weights and returns
-            total_value = sum(holding['value'] for holding in portfolio)
-            weights = [holding['value'] / total_value for holding in portfolio]
+            # Holdings as parallel arrays: tickers and value weights
+            tickers = [holding['ticker'] for holding in portfolio]
+            values = np.fromiter((holding['value'] for holding in portfolio), dtype=np.float64, count=len(portfolio))
+            weights = values / values.sum()
             
             # Get historical data for all holdings
-            returns_data = {}
-            for holding in portfolio:
-                hist = self.get_historical_data(holding['ticker'], "1y")
-                if not hist.empty:
-                    returns_data[holding['ticker']] = hist['Close'].pct_change().dropna()
+            histories = self.get_historical_data_many(tickers, "1y")
+            closes = [hist['Close'].rename(ticker) for ticker, hist in histories.items() if not hist.empty]
+            
+            if not closes:
+                return {}
             
-            if not returns_data:
+            # Returns between the days every holding with history traded; no forward-filled flat days
+            prices = pd.concat(closes, axis=1).dropna()
+            if len(prices) < 2:
                 return {}
+            returns = simple_returns(prices.to_numpy(dtype=np.float64))
             
-            # Calculate portfolio metrics
-            portfolio_returns = pd.DataFrame(returns_data)
-            portfolio_returns = portfolio_returns.fillna(0)
+            # Holdings without history are left out and the rest reweighted, rather than read as flat
+            positions = prices.columns.get_indexer(tickers)
+            held = positions >= 0
+            column_weights = np.bincount(positions[held], weights=weights[held], minlength=len(prices.columns))
+            column_weights /= column_weights.sum()
             
             # Portfolio return
-            portfolio_return = (portfolio_returns * weights).sum(axis=1)
+            portfolio_return = returns @ column_weights
+            mean_return = portfolio_return.mean()
             
             # Volatility
-            portfolio_vol = portfolio_return.std() * np.sqrt(252)  # Annualized
+            portfolio_vol = portfolio_return.std(ddof=1) * SQRT_TRADING_DAYS  # Annualized
             
             # Sharpe ratio (assuming 2% risk-free rate)
             risk_free_rate = 0.02
-            sharpe_ratio = (portfolio_return.mean() * 252 - risk_free_rate) / portfolio_vol
+            sharpe_ratio = (mean_return * TRADING_DAYS - risk_free_rate) / portfolio_vol
             
             # Maximum drawdown
-            cumulative_returns = (1 + portfolio_return).cumprod()
-            running_max = cumulative_returns.expanding().max()
-            drawdown = (cumulative_returns - running_max) / running_max
-            max_drawdown = drawdown.min()
+            cumulative_returns = np.cumprod(1 + portfolio_return)
+            max_drawdown = compute_max_drawdown(cumulative_returns)
             
             return {
-                'total_return': (cumulative_returns.iloc[-1] - 1) * 100,
-                'annualized_return': portfolio_return.mean() * 252 * 100,
+                'total_return': (cumulative_returns[-1] - 1) * 100,
+                'annualized_return': mean_return * TRADING_DAYS * 100,
                 'volatility': portfolio_vol * 100,
                 'sharpe_ratio': sharpe_ratio,
                 'max_drawdown': max_drawdown * 100,
@@ -208,44 +548,122 @@ class StockDataService:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate Relative Strength Index"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
+        avg_gain, avg_loss = self._wilder_averages(prices, period)
+        rs = avg_gain / avg_loss
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
+    def _wilder_averages(self, prices: pd.Series, period: int = 14) -> Tuple[pd.Series, pd.Series]:
+        """Wilder-smoothed average gain and loss used by RSI"""
+        delta = np.diff(prices.to_numpy(dtype=float), prepend=np.nan)
+        
+        # Smooth gains and losses together in a single ewm pass
+        moves = pd.DataFrame({
+            'gain': np.maximum(delta, 0),
+            'loss': np.maximum(-delta, 0)
+        }, index=prices.index)
+        averages = moves.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        return averages['gain'], averages['loss']
+    
+    def _submit(self, fn, *args):
+        """Run a call on the shared fetch pool in a copy of the caller's context, so it sees the open write batch"""
+        return get_fetch_executor().submit(contextvars.copy_context().run, fn, *args)
+    
+    def _pool_map(self, fn, items, on_timeout) -> List:
+        """Map a call over items on the shared fetch pool under one FETCH_TIMEOUT deadline, results in input order
+
+        Items unfinished at the deadline get ``on_timeout(item)``. Cancelling only drops
+        calls still queued; one already running keeps its worker until it returns.
+        """
+        futures = [self._submit(fn, item) for item in items]
+        done, _ = wait(futures, timeout=Config.FETCH_TIMEOUT)
+        
+        results = []
+        for item, future in zip(items, futures):
+            if future in done:
+                results.append(future.result())
+            else:
+                future.cancel()
+                print(f"Error fetching data for {item}: timed out")
+                results.append(on_timeout(item))
+        return results
+    
+    @contextmanager
+    def batch_cache_writes(self):
+        """Buffer on-disk cache writes and flush them together when the block exits"""
+        if _pending_writes.get() is not None:
+            yield
+            return
+        
+        batch = {'open': True, 'writes': []}
+        token = _pending_writes.set(batch)
+        try:
+            yield
+        finally:
+            _pending_writes.reset(token)
+            # Close the batch under the lock; a straggling worker then writes straight through
+            with _pending_writes_lock:
+                batch['open'] = False
+            self.disk_cache.set_many(batch['writes'])
+    
+    def _persist(self, key: str, value, ttl: int):
+        """Write an entry to the on-disk cache, deferring it inside a batch"""
+        batch = _pending_writes.get()
+        if batch is not None:
+            with _pending_writes_lock:
+                if batch['open']:
+                    batch['writes'].append((key, value, ttl))
+                    return
+        self.disk_cache.set(key, value, ttl)
+    
+    @property
+    def quote_cache_size(self) -> int:
+        """Number of quotes currently held in the shared in-memory cache"""
+        return len(self.cache)
+    
     def _is_cache_valid(self, ticker: str) -> bool:
         """Check if cached data is still valid"""
         if ticker not in self.cache_timestamps:
             return False
         
         cache_age = time.time() - self.cache_timestamps[ticker]
-        return cache_age < Config.YAHOO_FINANCE_CACHE_TTL
+        return cache_age < _CACHE_TTL
     
     def _cache_data(self, ticker: str, data: Dict):
         """Cache data with timestamp"""
-        self.cache[ticker] = data
-        self.cache_timestamps[ticker] = time.time()
-        
-        # Clean old cache entries
-        if len(self.cache) > Config.MAX_CACHE_SIZE:
-            oldest_ticker = min(self.cache_timestamps.keys(), 
-                              key=lambda k: self.cache_timestamps[k])
-            del self.cache[oldest_ticker]
-            del self.cache_timestamps[oldest_ticker]
+        with self._cache_lock:
+            self.cache[ticker] = data
+            self.cache.move_to_end(ticker)
+            self.cache_timestamps[ticker] = time.time()
+            
+            # Evict least recently used entries
+            while len(self.cache) > _MAX_CACHE_SIZE:
+                oldest_ticker, _ = self.cache.popitem(last=False)
+                self.cache_timestamps.pop(oldest_ticker, None)
     
-    def _passes_filters(self, data: Dict, filters: Dict) -> bool:
-        """Check if stock passes screening filters"""
-        if 'min_pe' in filters and data['pe_ratio'] < filters['min_pe']:
-            return False
-        if 'max_pe' in filters and data['pe_ratio'] > filters['max_pe']:
-            return False
-        if 'min_dividend' in filters and data['dividend_yield'] < filters['min_dividend']:
-            return False
-        if 'sector' in filters and data['sector'] != filters['sector']:
-            return False
-        return True
+    def _get_history_entry(self, key: Tuple[str, str]) -> Optional[Dict]:
+        """Cached history entry for a (ticker, period) key, marked as recently used"""
+        with _history_cache_lock:
+            entry = self.history_cache.get(key)
+            if entry is not None:
+                self.history_cache.move_to_end(key)
+            return entry
+    
+    def _cache_history(self, key: Tuple[str, str], entry: Dict):
+        """Store a history entry, evicting the least recently used beyond the cache size"""
+        with _history_cache_lock:
+            self.history_cache[key] = entry
+            self.history_cache.move_to_end(key)
+            while len(self.history_cache) > _MAX_CACHE_SIZE:
+                self.history_cache.popitem(last=False)
+    
+    def _filter_mask(self, df: pd.DataFrame, filters: Dict) -> np.ndarray:
+        """AND every active screening filter into one boolean mask over the raw column arrays"""
+        mask = np.ones(len(df), dtype=bool)
+        for key, column, compare in self.SCREEN_FILTERS:
+            if key in filters:
+                mask &= compare(df[column].to_numpy(), filters[key])
+        return mask
     
     def _get_fallback_data(self, ticker: str) -> Dict:
         """Get fallback data when primary API fails"""
@@ -267,3 +685,8 @@ class StockDataService:
             'avg_volume': 0,
             'last_updated': datetime.now().isoformat()
         }
+
+@lru_cache(maxsize=1)
+def get_stock_data_service() -> StockDataService:
+    """Shared StockDataService so every caller in the process reuses one instance"""
+    return StockDataService()
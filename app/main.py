@@ -1,8 +1,6 @@
 import streamlit as st
-from pages.dashboard import show_dashboard
-from pages.stock_browser import show_stock_browser
-from pages.portfolio import show_portfolio_simulator
-from pages.market_analysis import show_market_analysis
+
+from utils.styles import get_custom_css
 
 # Page configuration
 st.set_page_config(
@@ -12,35 +10,28 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Hide the Streamlit sidebar completely
-st.markdown("""
-<style>
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    .stDeployButton {display: none;}
-    .stApp > header {display: none;}
-    .stApp > footer {display: none;}
-    .stApp > div[data-testid="stToolbar"] {display: none;}
-    .stApp > div[data-testid="stDecoration"] {display: none;}
-</style>
-""", unsafe_allow_html=True)
-
 def main():
+    # Inject the shared styles, including the hidden chrome, as one element per run
+    st.markdown(get_custom_css(), unsafe_allow_html=True)
+    
     # Header with better icon
     st.markdown('<h1 class="main-header">📈 Stock/ETF Dashboard</h1>', unsafe_allow_html=True)
     
     # Horizontal navigation tabs at the top
     tab1, tab2, tab3, tab4 = st.tabs(["🏠 Dashboard", "🔍 Stock Browser", "💼 Portfolio Simulator", "📊 Market Analysis"])
     
-    # Display the selected page
+    # Display the selected page, importing each page's stack only when it renders
     with tab1:
+        from pages.dashboard import show_dashboard
         show_dashboard()
     with tab2:
+        from pages.stock_browser import show_stock_browser
         show_stock_browser()
     with tab3:
+        from pages.portfolio import show_portfolio_simulator
         show_portfolio_simulator()
     with tab4:
+        from pages.market_analysis import show_market_analysis
         show_market_analysis()
 
 if __name__ == "__main__":
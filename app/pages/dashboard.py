@@ -1,35 +1,208 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime
+from string import Template
 
 
-from data_service import StockDataService
 from portfolio_service import PortfolioService
-from utils.styles import get_custom_css
+from utils.services import (
+    get_data_service, cached_market_overview, cached_stock_data, cached_bulk_quotes, cached_historical_data
+)
 
 # Initialize services
 def get_services():
-    return StockDataService(), PortfolioService()
+    data_service = get_data_service()
+    return data_service, PortfolioService(data_service)
 
-def show_dashboard():
-    """Main dashboard view with improved design"""
-    # Apply custom CSS
-    st.markdown(get_custom_css(), unsafe_allow_html=True)
+# Expanded list of stocks across different sectors
+UNIVERSE_SECTORS = {
+    'Technology': ('AAPL', 'MSFT', 'GOOGL', 'TSLA', 'NVDA', 'META', 'AMZN', 'NFLX', 'AMD', 'INTC'),
+    'Financial Services': ('JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'AXP', 'BLK', 'SCHW', 'USB'),
+    'Healthcare': ('JNJ', 'PFE', 'UNH', 'ABBV', 'MRK', 'TMO', 'DHR', 'LLY', 'BMY', 'AMGN'),
+    'Consumer Goods': ('PG', 'KO', 'PEP', 'WMT', 'HD', 'MCD', 'SBUX', 'NKE', 'DIS', 'CMCSA'),
+    'Energy': ('XOM', 'CVX', 'COP', 'EOG', 'SLB', 'KMI', 'PSX', 'VLO', 'MPC', 'OXY'),
+    'Industrial': ('BA', 'CAT', 'MMM', 'GE', 'HON', 'UPS', 'FDX', 'LMT', 'RTX', 'NOC'),
+    'Materials': ('LIN', 'APD', 'FCX', 'NEM', 'DOW', 'DD', 'ECL', 'ALB', 'NUE')
+}
+STOCK_UNIVERSE = tuple(ticker for tickers in UNIVERSE_SECTORS.values() for ticker in tickers)
+
+# Sectors are fixed for the universe, so mover cards never need a profile request
+SECTOR_MAP = {ticker: sector for sector, tickers in UNIVERSE_SECTORS.items() for ticker in tickers}
+
+# Universe explainer markdown, generated once from the sector map
+UNIVERSE_EXPLAINER = "\n\n".join([
+    f"**Why These {len(STOCK_UNIVERSE)} Stocks?**",
+    f"We monitor a carefully selected universe of major stocks across {len(UNIVERSE_SECTORS)} key sectors "
+    "to give you a comprehensive view of market movement:",
+    *(f"**{sector} ({len(tickers)} stocks)**: {', '.join(tickers)}" for sector, tickers in UNIVERSE_SECTORS.items()),
+    "**Why This Selection?**\n"
+    "- **Market Coverage**: Represents ~40% of total US market cap\n"
+    "- **Sector Diversity**: Covers all major economic sectors\n"
+    "- **Liquidity**: All stocks have high trading volume\n"
+    "- **Market Leaders**: Most are S&P 500 components\n"
+    "- **Real-time Data**: Live prices from Yahoo Finance API"
+])
+
+# Mover cards shown on the dashboard
+TOP_MOVER_COUNT = 8
+
+@st.cache_data(ttl=60)
+def get_top_movers(universe):
+    """Stocks moving more than 1% today, with the biggest TOP_MOVER_COUNT movers first and ranked"""
+    # One batched download prices the whole universe
+    quotes = cached_bulk_quotes(universe)
+    if quotes.empty:
+        return []
+    
+    # Only include priced stocks with meaningful (>1%) moves, in one vectorized pass
+    moves = np.abs(quotes['price_change_percent'].to_numpy(dtype=np.float64))
+    keep = np.flatnonzero((quotes['current_price'].to_numpy() > 0) & (moves > 1.0))
+    
+    # Only the shown cards need ranking; the rest just feed the breadth counts
+    ranked = -moves[keep]
+    if len(keep) > TOP_MOVER_COUNT:
+        top = np.sort(np.argpartition(ranked, TOP_MOVER_COUNT - 1)[:TOP_MOVER_COUNT])
+        rest = np.setdiff1d(np.arange(len(keep)), top, assume_unique=True)
+        order = np.concatenate([top[np.argsort(ranked[top], kind='stable')], rest])
+    else:
+        order = np.argsort(ranked, kind='stable')
+    return quotes.iloc[keep[order]].to_dict('records')
+
+# (history column, legend name, line color) for each moving average on the price chart
+SMA_TRACES = (
+    ('SMA_20', '20-Day SMA', '#FFD93D'),
+    ('SMA_50', '50-Day SMA', '#6BCF7F')
+)
+
+@st.cache_data(ttl=3600)
+def build_price_figure(ticker, period):
+    """Price chart with SMAs as a plotly figure dict, or None without history"""
+    hist_data = cached_historical_data(ticker, period)
+    
+    if hist_data.empty:
+        return None
+    
+    # Plotly is only needed once a chart is actually drawn
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    # Dates are formatted once and shared by every trace; with plotly 6's base64 typed arrays,
+    # float32 halves the serialized series
+    dates = hist_data.index.strftime('%Y-%m-%d').to_numpy()
     
-    st.header("🎯 Market Overview")
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=hist_data['Close'].to_numpy(dtype=np.float32),
+        mode='lines',
+        name='Close Price',
+        line=dict(color='#00D4AA', width=3)
+    ))
     
+    # The service always ships both SMAs, computed in one prefix-sum pass over the closes
+    for column, name, color in SMA_TRACES:
+        fig.add_trace(go.Scattergl(
+            x=dates,
+            y=hist_data[column].to_numpy(dtype=np.float32),
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=2, dash='dash')
+        ))
+    
+    fig.update_layout(
+        title=f"{ticker} - 1 Year Price Chart",
+        xaxis_title="Date",
+        yaxis_title="Price ($)",
+        height=500,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#FFFFFF'),
+        xaxis=dict(gridcolor='#333333'),
+        yaxis=dict(gridcolor='#333333'),
+        uirevision=ticker
+    )
+    
+    return fig.to_dict()
+
+# Card templates are parsed once at import; kept unindented so markdown doesn't treat them as code blocks
+MOVER_CARD_TEMPLATE = Template(
+    '<div class="mover-card">'
+    '<h4>$change_icon $ticker</h4>'
+    '<div style="font-size: 1.2rem; font-weight: bold; color: #FFFFFF;">$$$price</div>'
+    '<div class="$change_color">$change ($change_percent%)</div>'
+    '<div style="color: #888888; font-size: 0.9rem;">$sector</div>'
+    '</div>'
+)
+
+LOOKUP_CARD_TEMPLATE = Template(
+    '<div class="stock-lookup-card">'
+    '<h2 style="color: #00D4AA; text-align: center; margin-bottom: 2rem;">📊 $ticker - $company_name</h2>'
+    '<div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; margin-bottom: 2rem;">'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">Current Price</h4>'
+    '<div style="font-size: 1.5rem; font-weight: bold; color: #FFFFFF;">$$$price</div></div>'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">Price Change</h4>'
+    '<div class="$change_color">$change ($change_percent%)</div></div>'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">Volume</h4>'
+    '<div style="font-size: 1.2rem; color: #FFFFFF;">$volume</div></div>'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">Market Cap</h4>'
+    '<div style="font-size: 1.2rem; color: #FFFFFF;">$$${market_cap}B</div></div>'
+    '</div>'
+    '<div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem;">'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">P/E Ratio</h4>'
+    '<div style="font-size: 1.2rem; color: #FFFFFF;">$pe_ratio</div></div>'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">Dividend Yield</h4>'
+    '<div style="font-size: 1.2rem; color: #FFFFFF;">$dividend_yield</div></div>'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">Sector</h4>'
+    '<div style="font-size: 1.2rem; color: #FFFFFF;">$sector</div></div>'
+    '<div class="stock-metric"><h4 style="color: #888888; margin: 0;">52W High</h4>'
+    '<div style="font-size: 1.2rem; color: #FFFFFF;">$$$week_high</div></div>'
+    '</div>'
+    '</div>'
+)
+
+def get_mover_card_html(stock):
+    """Return the HTML card for a single top mover"""
+    ticker = stock['ticker']
+    change_percent = stock.get('price_change_percent', 0)
+    is_up = change_percent >= 0
+    
+    return MOVER_CARD_TEMPLATE.substitute(
+        change_icon="📈" if is_up else "📉",
+        ticker=ticker,
+        price=f"{stock.get('current_price', 0):,.2f}",
+        change_color="positive-change" if is_up else "negative-change",
+        change=f"{stock.get('price_change', 0):+.2f}",
+        change_percent=f"{change_percent:+.2f}",
+        sector=SECTOR_MAP.get(ticker, stock.get('sector', 'N/A'))
+    )
+
+def get_lookup_card_html(stock_data):
+    """Return the HTML card for a quick-lookup result"""
+    return LOOKUP_CARD_TEMPLATE.substitute(
+        ticker=stock_data['ticker'],
+        company_name=stock_data['company_name'],
+        price=f"{stock_data['current_price']:,.2f}",
+        change_color="positive-change" if stock_data.get('price_change', 0) >= 0 else "negative-change",
+        change=f"{stock_data.get('price_change', 0):+.2f}",
+        change_percent=f"{stock_data.get('price_change_percent', 0):+.2f}",
+        volume=f"{stock_data.get('volume', 0):,}",
+        market_cap=f"{stock_data.get('market_cap', 0)/1e9:.2f}",
+        pe_ratio=stock_data.get('pe_ratio') or 'N/A',
+        dividend_yield=f"{stock_data['dividend_yield']*100:.2f}%" if stock_data.get('dividend_yield') else 'N/A',
+        sector=stock_data.get('sector', 'N/A'),
+        week_high=stock_data.get('fifty_two_week_high') or 'N/A'
+    )
+
+@st.fragment(run_every=60)
+def show_market_overview():
+    """Index metrics, rerun on their own every minute without rerunning the page"""
     # Load market data first
     with st.spinner("🔄 Fetching market data..."):
         try:
-            # Force fresh data by clearing any potential cache
-            data_service, portfolio_service = get_services()
-            if hasattr(data_service, 'cache'):
-                data_service.cache.clear()
-            if hasattr(data_service, 'cache_timestamps'):
-                data_service.cache_timestamps.clear()
-            
-            market_overview = data_service.get_market_overview()
+            # Reruns within the cache TTL reuse the last overview
+            market_overview = cached_market_overview()
             
             # Validate the data silently
             if not market_overview:
@@ -71,6 +244,58 @@ def show_dashboard():
                 value="Loading...",
                 delta="Fetching data..."
             )
+
+@st.fragment
+def show_quick_lookup():
+    """Quick lookup form and result; a submit reruns only this panel"""
+    # Submitting as a form reruns once on Lookup rather than on every keystroke
+    with st.form("quick_lookup_form", clear_on_submit=False):
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            ticker = st.text_input("Enter stock ticker:", placeholder="AAPL, MSFT, GOOGL...", key="quick_lookup")
+        
+        with col2:
+            submitted = st.form_submit_button("🔍 Lookup", type="primary")
+    
+    if submitted and ticker:
+        with st.spinner(f"🔄 Fetching data for {ticker.upper()}..."):
+            stock_data = cached_stock_data(ticker.upper())
+            
+            if stock_data and stock_data.get('current_price', 0) > 0:
+                st.success(f"✅ Found {stock_data['company_name']}")
+                
+                # Beautiful stock data presentation
+                st.markdown(get_lookup_card_html(stock_data), unsafe_allow_html=True)
+                
+                # Show price chart
+                st.subheader("📈 Price Chart")
+                price_figure = build_price_figure(ticker.upper(), "1y")
+                
+                if price_figure:
+                    import plotly.graph_objects as go
+                    
+                    st.plotly_chart(go.Figure(price_figure), use_container_width=True)
+            else:
+                st.error(f"❌ Could not find data for {ticker.upper()}")
+
+def show_dashboard():
+    """Main dashboard view with improved design"""
+    header_col, refresh_col = st.columns([5, 1])
+    
+    with header_col:
+        st.header("🎯 Market Overview")
+    
+    with refresh_col:
+        # Reruns reuse the cached market data; this is the explicit way to fetch it fresh
+        if st.button("🔄 Refresh", key="refresh_market_data"):
+            cached_market_overview.clear()
+            cached_bulk_quotes.clear()
+            get_top_movers.clear()
+    
+    data_service, portfolio_service = get_services()
+    
+    show_market_overview()
     
     st.markdown("---")
     
@@ -79,108 +304,37 @@ def show_dashboard():
     st.markdown("*Shows stocks with the biggest price movements today (>1% change)*")
     
     # Explain the stock universe
-    with st.expander("ℹ️ **About the Stock Universe (69 stocks)**"):
-        st.markdown("""
-        **Why These 69 Stocks?**
-        
-        We monitor a carefully selected universe of major stocks across 7 key sectors to give you a comprehensive view of market movement:
-        
-        **Technology (10 stocks)**: AAPL, MSFT, GOOGL, TSLA, NVDA, META, AMZN, NFLX, AMD, INTC
-        
-        **Financial Services (10 stocks)**: JPM, BAC, WFC, GS, MS, C, AXP, BLK, SCHW, USB
-        
-        **Healthcare (10 stocks)**: JNJ, PFE, UNH, ABBV, MRK, TMO, DHR, LLY, BMY, AMGN
-        
-        **Consumer Goods (10 stocks)**: PG, KO, PEP, WMT, HD, MCD, SBUX, NKE, DIS, CMCSA
-        
-        **Energy (10 stocks)**: XOM, CVX, COP, EOG, SLB, KMI, PSX, VLO, MPC, OXY
-        
-        **Industrial (10 stocks)**: BA, CAT, MMM, GE, HON, UPS, FDX, LMT, RTX, NOC
-        
-        **Materials (9 stocks)**: LIN, APD, FCX, NEM, DOW, DD, ECL, ALB, NUE
-        
-        **Why This Selection?**
-        - **Market Coverage**: Represents ~40% of total US market cap
-        - **Sector Diversity**: Covers all major economic sectors
-        - **Liquidity**: All stocks have high trading volume
-        - **Market Leaders**: Most are S&P 500 components
-        - **Real-time Data**: Live prices from Yahoo Finance API
-        """)
+    with st.expander(f"ℹ️ **About the Stock Universe ({len(STOCK_UNIVERSE)} stocks)**"):
+        st.markdown(UNIVERSE_EXPLAINER)
     
     # Get a broader list of stocks to find real movers
     with st.spinner("🔄 Finding today's top movers..."):
-        # Expanded list of stocks across different sectors
-        stock_universe = [
-            # Tech
-            'AAPL', 'MSFT', 'GOOGL', 'TSLA', 'NVDA', 'META', 'AMZN', 'NFLX', 'AMD', 'INTC',
-            # Finance
-            'JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'AXP', 'BLK', 'SCHW', 'USB',
-            # Healthcare
-            'JNJ', 'PFE', 'UNH', 'ABBV', 'MRK', 'TMO', 'DHR', 'LLY', 'BMY', 'AMGN',
-            # Consumer
-            'PG', 'KO', 'PEP', 'WMT', 'HD', 'MCD', 'SBUX', 'NKE', 'DIS', 'CMCSA',
-            # Energy
-            'XOM', 'CVX', 'COP', 'EOG', 'SLB', 'KMI', 'PSX', 'VLO', 'MPC', 'OXY',
-            # Industrial
-            'BA', 'CAT', 'MMM', 'GE', 'HON', 'UPS', 'FDX', 'LMT', 'RTX', 'NOC',
-            # Materials
-            'LIN', 'APD', 'FCX', 'NEM', 'DOW', 'DD', 'ECL', 'ALB', 'NUE'
-        ]
-        
-        movers_data = []
-        for ticker in stock_universe:
-            try:
-                stock_data = data_service.get_stock_data(ticker)
-                if stock_data and stock_data.get('current_price', 0) > 0 and stock_data.get('price_change_percent'):
-                    # Only include stocks with meaningful price changes
-                    if abs(stock_data['price_change_percent']) > 1.0:  # Filter for >1% moves
-                        movers_data.append(stock_data)
-            except Exception as e:
-                continue
+        movers_data = get_top_movers(STOCK_UNIVERSE)
         
         if movers_data:
-            # Sort by absolute percentage change to find biggest movers
-            movers_data.sort(key=lambda x: abs(x.get('price_change_percent', 0)), reverse=True)
-            
-            # Display top movers in a grid
-            cols = st.columns(4)
-            for i, stock in enumerate(movers_data[:8]):  # Show top 8 movers
-                with cols[i % 4]:
-                    change_color = "positive-change" if stock.get('price_change_percent', 0) >= 0 else "negative-change"
-                    change_icon = "📈" if stock.get('price_change_percent', 0) >= 0 else "📉"
-                    
-                    st.markdown(f"""
-                    <div class="mover-card">
-                        <h4>{change_icon} {stock['ticker']}</h4>
-                        <div style="font-size: 1.2rem; font-weight: bold; color: #FFFFFF;">
-                            ${stock.get('current_price', 0):,.2f}
-                        </div>
-                        <div class="{change_color}">
-                            {stock.get('price_change', 0):+.2f} ({stock.get('price_change_percent', 0):+.2f}%)
-                        </div>
-                        <div style="color: #888888; font-size: 0.9rem;">
-                            {stock.get('sector', 'N/A')}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # Display top movers in a grid, sent to the browser as one element
+            cards = "".join(get_mover_card_html(stock) for stock in movers_data[:TOP_MOVER_COUNT])
+            st.markdown(f'<div class="mover-grid">{cards}</div>', unsafe_allow_html=True)
             
             # Show summary of movers
             st.markdown("---")
             st.markdown("**📊 Market Breadth Summary**")
             st.markdown("*Shows how many stocks moved significantly today (>1% change)*")
             
+            pcts = np.fromiter((s.get('price_change_percent', 0) for s in movers_data), dtype=np.float64, count=len(movers_data))
+            advancing = int((pcts > 0).sum())
+            declining = int((pcts < 0).sum())
+            
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                advancing = len([s for s in movers_data if s.get('price_change_percent', 0) > 0])
                 st.metric("📈 Stocks Up Today", advancing, delta=f"+{advancing}")
             
             with col2:
-                declining = len([s for s in movers_data if s.get('price_change_percent', 0) < 0])
                 st.metric("📉 Stocks Down Today", declining, delta=f"-{declining}")
             
             with col3:
-                st.metric("🔍 Total Stocks Monitored", len(stock_universe))
+                st.metric("🔍 Total Stocks Monitored", len(STOCK_UNIVERSE))
         
         else:
             st.info("📊 No significant movers found. Market might be quiet today!")
@@ -190,144 +344,13 @@ def show_dashboard():
     # Quick Stock Lookup with improved design
     st.header("🔍 Quick Stock Lookup")
     
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        ticker = st.text_input("Enter stock ticker:", placeholder="AAPL, MSFT, GOOGL...", key="quick_lookup")
-    
-    with col2:
-        if st.button("🔍 Lookup", type="primary", key="quick_lookup_btn"):
-            if ticker:
-                with st.spinner(f"🔄 Fetching data for {ticker.upper()}..."):
-                    stock_data = data_service.get_stock_data(ticker.upper())
-                    
-                    if stock_data and stock_data.get('current_price', 0) > 0:
-                        st.success(f"✅ Found {stock_data['company_name']}")
-                        
-                        # Beautiful stock data presentation
-                        st.markdown(f"""
-                        <div class="stock-lookup-card">
-                            <h2 style="color: #00D4AA; text-align: center; margin-bottom: 2rem;">
-                                📊 {stock_data['ticker']} - {stock_data['company_name']}
-                            </h2>
-                            
-                            <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; margin-bottom: 2rem;">
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">Current Price</h4>
-                                    <div style="font-size: 1.5rem; font-weight: bold; color: #FFFFFF;">
-                                        ${stock_data['current_price']:,.2f}
-                                    </div>
-                                </div>
-                                
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">Price Change</h4>
-                                    <div class="{"positive-change" if stock_data.get('price_change', 0) >= 0 else "negative-change"}">
-                                        {stock_data.get('price_change', 0):+.2f} ({stock_data.get('price_change_percent', 0):+.2f}%)
-                                    </div>
-                                </div>
-                                
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">Volume</h4>
-                                    <div style="font-size: 1.2rem; color: #FFFFFF;">
-                                        {stock_data.get('volume', 0):,}
-                                    </div>
-                                </div>
-                                
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">Market Cap</h4>
-                                    <div style="font-size: 1.2rem; color: #FFFFFF;">
-                                        ${stock_data.get('market_cap', 0)/1e9:.2f}B
-                                    </div>
-                                </div>
-                            </div>
-                            
-                            <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem;">
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">P/E Ratio</h4>
-                                    <div style="font-size: 1.2rem; color: #FFFFFF;">
-                                        {stock_data.get('pe_ratio', 'N/A') if stock_data.get('pe_ratio') else 'N/A'}
-                                    </div>
-                                </div>
-                                
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">Dividend Yield</h4>
-                                    <div style="font-size: 1.2rem; color: #FFFFFF;">
-                                        {f"{stock_data.get('dividend_yield', 0)*100:.2f}%" if stock_data.get('dividend_yield') else 'N/A'}
-                                    </div>
-                                </div>
-                                
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">Sector</h4>
-                                    <div style="font-size: 1.2rem; color: #FFFFFF;">
-                                        {stock_data.get('sector', 'N/A')}
-                                    </div>
-                                </div>
-                                
-                                <div class="stock-metric">
-                                    <h4 style="color: #888888; margin: 0;">52W High</h4>
-                                    <div style="font-size: 1.2rem; color: #FFFFFF;">
-                                        ${stock_data.get('fifty_two_week_high', 'N/A') if stock_data.get('fifty_two_week_high') else 'N/A'}
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Show price chart
-                        st.subheader("📈 Price Chart")
-                        hist_data = data_service.get_historical_data(ticker.upper(), "1y")
-                        
-                        if not hist_data.empty:
-                            fig = go.Figure()
-                            
-                            fig.add_trace(go.Scatter(
-                                x=hist_data.index,
-                                y=hist_data['Close'],
-                                mode='lines',
-                                name='Close Price',
-                                line=dict(color='#00D4AA', width=3)
-                            ))
-                            
-                            if 'SMA_20' in hist_data.columns:
-                                fig.add_trace(go.Scatter(
-                                    x=hist_data.index,
-                                    y=hist_data['SMA_20'],
-                                    mode='lines',
-                                    name='20-Day SMA',
-                                    line=dict(color='#FFD93D', width=2, dash='dash')
-                                ))
-                            
-                            if 'SMA_50' in hist_data.columns:
-                                fig.add_trace(go.Scatter(
-                                    x=hist_data.index,
-                                    y=hist_data['SMA_50'],
-                                    mode='lines',
-                                    name='50-Day SMA',
-                                    line=dict(color='#6BCF7F', width=2, dash='dash')
-                                ))
-                            
-                            fig.update_layout(
-                                title=f"{ticker.upper()} - 1 Year Price Chart",
-                                xaxis_title="Date",
-                                yaxis_title="Price ($)",
-                                height=500,
-                                showlegend=True,
-                                plot_bgcolor='rgba(0,0,0,0)',
-                                paper_bgcolor='rgba(0,0,0,0)',
-                                font=dict(color='#FFFFFF'),
-                                xaxis=dict(gridcolor='#333333'),
-                                yaxis=dict(gridcolor='#333333')
-                            )
-                            
-                            st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.error(f"❌ Could not find data for {ticker.upper()}")
+    show_quick_lookup()
     
     st.markdown("---")
     
     # Recent portfolios
     st.header("💼 Recent Portfolios")
-    portfolios = portfolio_service.get_all_portfolios()
+    portfolios = portfolio_service.get_all_portfolios(include_metrics=True)
     
     if portfolios:
         for portfolio in portfolios:
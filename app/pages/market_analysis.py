@@ -1,17 +1,29 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+import numpy as np
+from types import MappingProxyType
 
 
-from data_service import StockDataService
-from utils.styles import get_custom_css
+from utils.services import cached_stock_data_many
+
+# Popular stocks by sector for analysis
+SECTOR_STOCKS = MappingProxyType({
+    'Technology': ('AAPL', 'MSFT', 'GOOGL', 'NVDA', 'META'),
+    'Healthcare': ('JNJ', 'PFE', 'UNH', 'ABBV', 'TMO'),
+    'Financial': ('JPM', 'BAC', 'WFC', 'GS', 'MS'),
+    'Consumer': ('AMZN', 'TSLA', 'NFLX', 'HD', 'MCD'),
+    'Industrial': ('BA', 'CAT', 'GE', 'MMM', 'HON')
+})
+TICKER_TO_SECTOR = {ticker: sector for sector, stocks in SECTOR_STOCKS.items() for ticker in stocks}
+
+# Major stocks sampled for market breadth
+BREADTH_STOCKS = ('AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'JPM', 'JNJ')
+
+# Every ticker the page reads, deduplicated so overlapping names are fetched once
+ANALYSIS_TICKERS = tuple(dict.fromkeys((*TICKER_TO_SECTOR, *BREADTH_STOCKS)))
 
 def show_market_analysis():
     """Market analysis and insights with improved design"""
-    # Apply custom CSS
-    st.markdown(get_custom_css(), unsafe_allow_html=True)
-    
     st.header("📊 Market Analysis")
     
     # Sector performance
@@ -23,67 +35,37 @@ def show_market_analysis():
     
     st.markdown("*Shows how each major sector performed today based on average price changes of key stocks*")
     
-    # Popular stocks by sector for analysis
-    sector_stocks = {
-        'Technology': ['AAPL', 'MSFT', 'GOOGL', 'NVDA', 'META'],
-        'Healthcare': ['JNJ', 'PFE', 'UNH', 'ABBV', 'TMO'],
-        'Financial': ['JPM', 'BAC', 'WFC', 'GS', 'MS'],
-        'Consumer': ['AMZN', 'TSLA', 'NFLX', 'HD', 'MCD'],
-        'Industrial': ['BA', 'CAT', 'GE', 'MMM', 'HON']
-    }
-    
-    sector_performance = {}
-    
-    for sector, stocks in sector_stocks.items():
-        sector_return = 0
-        valid_stocks = 0
-        
-        for ticker in stocks:
-            try:
-                data_service = StockDataService()
-                stock_data = data_service.get_stock_data(ticker)
-                if stock_data and stock_data.get('price_change_percent'):
-                    sector_return += stock_data['price_change_percent']
-                    valid_stocks += 1
-            except:
-                continue
-        
-        if valid_stocks > 0:
-            sector_performance[sector] = sector_return / valid_stocks
+    # Fetch the sector and breadth quotes together, concurrently; reruns within the TTL reuse them
+    quotes = cached_stock_data_many(ANALYSIS_TICKERS)
+    
+    # Average each sector's daily change in one grouped reduction
+    quotes_df = pd.DataFrame([
+        {'ticker': ticker, 'price_change_percent': data.get('price_change_percent', 0)}
+        for ticker, data in quotes.items() if data
+    ], columns=['ticker', 'price_change_percent'])
+    quotes_df = quotes_df[quotes_df['price_change_percent'] != 0]
+    sector_performance = (
+        quotes_df.groupby(quotes_df['ticker'].map(TICKER_TO_SECTOR), sort=False)['price_change_percent']
+        .mean()
+        .to_dict()
+    )
     
     if sector_performance:
+        # Plotly is only needed once there is a chart to draw
+        import plotly.express as px
+        
         # Display sector performance in easy-to-read format first
         st.subheader("📊 Sector Performance Summary")
         
-        # Create a clean table format
-        col1, col2, col3 = st.columns(3)
-        
         # Sort sectors by performance
         sorted_sectors = sorted(sector_performance.items(), key=lambda x: x[1], reverse=True)
         
-        with col1:
-            for i in range(0, len(sorted_sectors), 3):
-                if i < len(sorted_sectors):
-                    sector, change = sorted_sectors[i]
-                    color = "🟢" if change > 0 else "🔴"
-                    st.markdown(f"**{color} {sector}**")
-                    st.markdown(f"*{change:+.2f}%*")
-        
-        with col2:
-            for i in range(1, len(sorted_sectors), 3):
-                if i < len(sorted_sectors):
-                    sector, change = sorted_sectors[i]
-                    color = "🟢" if change > 0 else "🔴"
-                    st.markdown(f"**{color} {sector}**")
-                    st.markdown(f"*{change:+.2f}%*")
-        
-        with col3:
-            for i in range(2, len(sorted_sectors), 3):
-                if i < len(sorted_sectors):
-                    sector, change = sorted_sectors[i]
-                    color = "🟢" if change > 0 else "🔴"
-                    st.markdown(f"**{color} {sector}**")
-                    st.markdown(f"*{change:+.2f}%*")
+        # Lay the sectors out in rank order on a CSS grid, sent to the browser as one element
+        cells = "".join(
+            f'<div><strong>{"🟢" if change > 0 else "🔴"} {sector}</strong><p><em>{change:+.2f}%</em></p></div>'
+            for sector, change in sorted_sectors
+        )
+        st.markdown(f'<div class="sector-grid">{cells}</div>', unsafe_allow_html=True)
         
         st.markdown("---")
         st.subheader("📈 Visual Chart")
@@ -141,31 +123,26 @@ def show_market_analysis():
         These represent different sectors and give a snapshot of overall market sentiment.
         """)
     
-    # Analyze popular stocks for market breadth
-    popular_stocks = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'JPM', 'JNJ']
-    
-    advancing = 0
-    declining = 0
-    unchanged = 0
-    
+    # Analyze popular stocks for market breadth from the quotes already loaded
     stock_data_list = []
     
-    for ticker in popular_stocks:
+    for ticker in BREADTH_STOCKS:
         try:
-            data_service = StockDataService()
-            data = data_service.get_stock_data(ticker)
+            data = quotes.get(ticker)
             if data and data.get('price_change'):
                 stock_data_list.append(data)
-                if data['price_change'] > 0:
-                    advancing += 1
-                elif data['price_change'] < 0:
-                    declining += 1
-                else:
-                    unchanged += 1
         except:
             continue
     
+    # Count advancing/declining/unchanged in one vectorized pass
+    changes = np.fromiter((data['price_change'] for data in stock_data_list), dtype=np.float64, count=len(stock_data_list))
+    advancing = int((changes > 0).sum())
+    declining = int((changes < 0).sum())
+    unchanged = int((changes == 0).sum())
+    
     if stock_data_list:
+        import plotly.graph_objects as go
+        
         st.subheader("📊 Today's Market Sentiment")
         
         col1, col2, col3 = st.columns(3)
@@ -218,16 +195,24 @@ def show_market_analysis():
         st.subheader("🚀 Top Movers")
         
         # Sort by absolute change
-        stock_data_list.sort(key=lambda x: abs(x.get('price_change_percent', 0)), reverse=True)
-        
-        top_movers_df = pd.DataFrame(stock_data_list[:10])
-        
-        # Format for display
-        top_movers_df['current_price'] = top_movers_df['current_price'].apply(lambda x: f"${x:,.2f}" if x else "N/A")
-        top_movers_df['price_change'] = top_movers_df['price_change'].apply(lambda x: f"{x:+.2f}" if x else "N/A")
-        top_movers_df['price_change_percent'] = top_movers_df['price_change_percent'].apply(lambda x: f"{x:+.2f}%" if x else "N/A")
+        pcts = np.fromiter((s.get('price_change_percent', 0) for s in stock_data_list), dtype=np.float64, count=len(stock_data_list))
+        order = np.argsort(-np.abs(pcts), kind='stable')
+        stock_data_list = [stock_data_list[i] for i in order]
+        
+        # Format the display rows in one pass instead of per-column applies
+        top_movers = [
+            {
+                'ticker': stock['ticker'],
+                'company_name': stock.get('company_name'),
+                'current_price': f"${stock['current_price']:,.2f}" if stock.get('current_price') else "N/A",
+                'price_change': f"{stock['price_change']:+.2f}" if stock.get('price_change') else "N/A",
+                'price_change_percent': f"{stock['price_change_percent']:+.2f}%" if stock.get('price_change_percent') else "N/A",
+                'sector': stock.get('sector')
+            }
+            for stock in stock_data_list[:10]
+        ]
         
         st.dataframe(
-            top_movers_df[['ticker', 'company_name', 'current_price', 'price_change', 'price_change_percent', 'sector']],
+            top_movers,
             use_container_width=True
         )
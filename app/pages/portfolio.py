@@ -2,24 +2,61 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
+import csv
+import io
+import uuid
 from datetime import datetime
 
 
-from data_service import StockDataService
+from config import Config
 from portfolio_service import PortfolioService
-from utils.styles import get_custom_css
+from utils.metrics import TRADING_DAYS, SQRT_TRADING_DAYS, beta_correlation, portfolio_stats, simple_returns
+from utils.services import cached_stock_data, cached_batch_closes, get_portfolio_store
+
+# Row labels of the analysis CSV export, in order
+EXPORT_METRICS = (
+    'Initial Investment', 'Final Value', 'Total Return', 'Annualized Return',
+    'Volatility', 'Sharpe Ratio', 'Max Drawdown', 'Beta', 'Correlation'
+)
+
+@st.cache_data(show_spinner=False)
+def build_analysis_csv(values):
+    """Metric/value CSV for the analysis export, built once per set of results"""
+    # Nine fixed rows, so the stdlib writer is enough
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(('Metric', 'Value'))
+    writer.writerows(zip(EXPORT_METRICS, values))
+    return buffer.getvalue()
+
+def get_portfolio_owner() -> str:
+    """Store owner key: the signed-in user's email, else a deployer-configured shared namespace, else this session"""
+    try:
+        user = st.user if hasattr(st, 'user') else st.experimental_user
+        email = user.get('email')
+    except Exception as e:
+        print(f"Error reading signed-in user: {e}")
+        email = None
+    
+    if email:
+        return email
+    if Config.PORTFOLIO_OWNER:
+        return Config.PORTFOLIO_OWNER
+    
+    # Signed-out visitors keep their scenarios private to their own session
+    if 'portfolio_owner' not in st.session_state:
+        st.session_state.portfolio_owner = f"session:{uuid.uuid4().hex}"
+    return st.session_state.portfolio_owner
 
 def show_portfolio_simulator():
     """Real portfolio analysis tool with historical performance simulation"""
-    # Apply custom CSS
-    st.markdown(get_custom_css(), unsafe_allow_html=True)
-    
     st.header("💼 Portfolio Analysis & Simulation")
     st.markdown("Simulate historical performance and analyze investment strategies with real market data.")
     
-    # Initialize session state for portfolios
-    if 'portfolios' not in st.session_state:
-        st.session_state.portfolios = {}
+    # Scenarios live in the store under the visitor's owner key; session state carries at most that key
+    owner = get_portfolio_owner()
+    store = get_portfolio_store()
+    portfolio_names = store.list_names(owner)
     
     # Portfolio creation section
     st.subheader("📝 Create Investment Scenario")
@@ -33,32 +70,35 @@ def show_portfolio_simulator():
     
     with col3:
         if st.button("➕ Create Scenario", type="primary"):
-            if portfolio_name and portfolio_name not in st.session_state.portfolios:
-                st.session_state.portfolios[portfolio_name] = {
+            name_taken = portfolio_name in portfolio_names
+            if portfolio_name and not name_taken:
+                store.save(owner, portfolio_name, {
                     'stocks': {},
                     'created': datetime.now().strftime("%Y-%m-%d %H:%M"),
                     'initial_capital': initial_capital,
                     'analysis_period': '1y'  # Default to 1 year
-                }
+                })
                 st.success(f"✅ Investment scenario '{portfolio_name}' created!")
                 st.rerun()
-            elif portfolio_name in st.session_state.portfolios:
+            elif name_taken:
                 st.error("❌ Scenario name already exists!")
     
     st.markdown("---")
     
     # Portfolio management section
-    if st.session_state.portfolios:
+    if portfolio_names:
         st.subheader("📊 Analyze Investment Scenarios")
         
         # Portfolio selector
         selected_portfolio = st.selectbox(
             "Select Scenario:",
-            list(st.session_state.portfolios.keys())
+            portfolio_names
         )
         
-        if selected_portfolio:
-            portfolio = st.session_state.portfolios[selected_portfolio]
+        # Only the selected scenario is loaded
+        portfolio = store.load(owner, selected_portfolio) if selected_portfolio else None
+        
+        if portfolio:
             
             # Analysis period selector
             col1, col2 = st.columns([1, 3])
@@ -69,7 +109,9 @@ def show_portfolio_simulator():
                     index=1,
                     key=f"period_{selected_portfolio}"
                 )
-                portfolio['analysis_period'] = analysis_period
+                if portfolio['analysis_period'] != analysis_period:
+                    portfolio['analysis_period'] = analysis_period
+                    store.save(owner, selected_portfolio, portfolio)
             
             with col2:
                 st.markdown(f"**Initial Investment: ${portfolio['initial_capital']:,.0f}**")
@@ -93,8 +135,7 @@ def show_portfolio_simulator():
                         ticker = ticker.upper()
                         try:
                             # Get current stock data
-                            data_service = StockDataService()
-                            stock_data = data_service.get_stock_data(ticker)
+                            stock_data = cached_stock_data(ticker)
                             if stock_data and stock_data.get('current_price', 0) > 0:
                                 current_price = stock_data['current_price']
                                 portfolio['stocks'][ticker] = {
@@ -104,6 +145,7 @@ def show_portfolio_simulator():
                                     'company_name': stock_data.get('company_name', ticker),
                                     'added_at': datetime.now().strftime("%Y-%m-%d %H:%M")
                                 }
+                                store.save(owner, selected_portfolio, portfolio)
                                 st.success(f"✅ Added {ticker} ({allocation_percent}% allocation)")
                                 st.rerun()
                             else:
@@ -120,44 +162,55 @@ def show_portfolio_simulator():
                 # Run portfolio simulation
                 with st.spinner("🔄 Analyzing historical performance..."):
                     try:
-                        # Get historical data for all stocks
-                        portfolio_returns = {}
-                        stock_weights = {}
-                        total_allocation = sum(stock['allocation_percent'] for stock in portfolio['stocks'].values())
+                        # Weights over all holdings in one pass
+                        tickers = list(portfolio['stocks'])
+                        allocations = np.fromiter(
+                            (portfolio['stocks'][ticker]['allocation_percent'] for ticker in tickers),
+                            dtype=np.float64, count=len(tickers)
+                        )
+                        all_weights = allocations / allocations.sum()
                         
-                        for ticker, holding in portfolio['stocks'].items():
-                            # Get historical data
-                            hist_data = data_service.get_historical_data(ticker, portfolio['analysis_period'])
-                            if not hist_data.empty:
-                                # Calculate returns
-                                returns = hist_data['Close'].pct_change().dropna()
-                                portfolio_returns[ticker] = returns
-                                stock_weights[ticker] = holding['allocation_percent'] / total_allocation
+                        # Every holding and the S&P 500 benchmark from batched downloads on one date index
+                        closes = cached_batch_closes(tuple(tickers) + ('^GSPC',), portfolio['analysis_period'])
+                        benchmark = ['^GSPC'] if '^GSPC' in closes and closes['^GSPC'].notna().any() else []
                         
-                        if portfolio_returns:
-                            # Calculate portfolio performance
-                            portfolio_df = pd.DataFrame(portfolio_returns)
-                            portfolio_df = portfolio_df.fillna(0)
+                        held = [i for i, ticker in enumerate(tickers) if ticker in closes]
+                        
+                        if held:
+                            held_tickers = [tickers[i] for i in held]
+                            # Allocations of tickers without prices are dropped, so spread their share over the rest
+                            weights = all_weights[held]
+                            weights /= weights.sum()
+                            
+                            # Keep the dates every holding and the benchmark traded, so each portfolio
+                            # return is paired with a benchmark return over the same interval
+                            aligned = closes[held_tickers + benchmark].dropna()
+                            prices_df = aligned[held_tickers]
+                            prices = prices_df.to_numpy(dtype=np.float64)
+                            sp500_returns = (
+                                aligned['^GSPC'].pct_change().iloc[1:] if benchmark else pd.Series(dtype=np.float64)
+                            )
                             
-                            # Weighted portfolio returns
-                            weighted_returns = (portfolio_df * pd.Series(stock_weights)).sum(axis=1)
+                            # Weighted returns, growth curve and risk metrics in one call over the returns matrix
+                            returns = simple_returns(prices)
+                            stats = portfolio_stats(returns, weights)
+                            weighted = stats['weighted_returns']
+                            cumulative = stats['cumulative']
                             
                             # Calculate metrics
-                            total_return = ((1 + weighted_returns).prod() - 1) * 100
-                            annualized_return = ((1 + total_return/100) ** (252/len(weighted_returns)) - 1) * 100
-                            volatility = weighted_returns.std() * np.sqrt(252) * 100
+                            total_return = stats['total_return'] * 100
+                            annualized_return = ((1 + total_return/100) ** (TRADING_DAYS/len(weighted)) - 1) * 100
+                            volatility = stats['volatility'] * SQRT_TRADING_DAYS * 100
                             sharpe_ratio = (annualized_return / 100) / (volatility / 100) if volatility > 0 else 0
-                            
-                            # Calculate max drawdown
-                            cumulative_returns = (1 + weighted_returns).cumprod()
-                            running_max = cumulative_returns.expanding().max()
-                            drawdown = (cumulative_returns - running_max) / running_max
-                            max_drawdown = drawdown.min() * 100
+                            max_drawdown = stats['max_drawdown'] * 100
                             
                             # Final portfolio value
                             final_value = portfolio['initial_capital'] * (1 + total_return/100)
                             absolute_gain = final_value - portfolio['initial_capital']
                             
+                            # Dated series only for charting and benchmark alignment
+                            weighted_returns = pd.Series(weighted, index=prices_df.index[1:])
+                            
                             # Display results
                             col1, col2, col3, col4 = st.columns(4)
                             
@@ -177,10 +230,10 @@ def show_portfolio_simulator():
                             st.markdown("**Performance Over Time**")
                             fig = go.Figure()
                             
-                            # Portfolio performance
+                            # Portfolio performance; plotly 6 ships float32 arrays as base64, half the bytes of float64
                             fig.add_trace(go.Scatter(
-                                x=cumulative_returns.index,
-                                y=cumulative_returns.values * portfolio['initial_capital'],
+                                x=weighted_returns.index,
+                                y=(cumulative * portfolio['initial_capital']).astype(np.float32),
                                 mode='lines',
                                 name='Your Portfolio',
                                 line=dict(color='#00D4AA', width=3)
@@ -188,23 +241,22 @@ def show_portfolio_simulator():
                             
                             # S&P 500 comparison
                             try:
-                                sp500_data = data_service.get_historical_data('^GSPC', portfolio['analysis_period'])
-                                if not sp500_data.empty:
-                                    sp500_returns = sp500_data['Close'].pct_change().dropna()
-                                    sp500_cumulative = (1 + sp500_returns).cumprod()
-                                    sp500_final_value = portfolio['initial_capital'] * sp500_cumulative.iloc[-1]
+                                if not sp500_returns.empty:
+                                    # Growth curve straight from the raw array; the index is only needed as chart x values
+                                    sp500_array = sp500_returns.to_numpy()
+                                    sp500_cumulative = np.cumprod(1 + sp500_array)
                                     
                                     fig.add_trace(go.Scatter(
-                                        x=sp500_cumulative.index,
-                                        y=sp500_cumulative.values * portfolio['initial_capital'],
+                                        x=sp500_returns.index,
+                                        y=(sp500_cumulative * portfolio['initial_capital']).astype(np.float32),
                                         mode='lines',
                                         name='S&P 500',
                                         line=dict(color='#FF6B6B', width=2, dash='dash')
                                     ))
                                     
                                     # S&P 500 metrics
-                                    sp500_return = ((sp500_cumulative.iloc[-1] - 1) * 100)
-                                    sp500_vol = sp500_returns.std() * np.sqrt(252) * 100
+                                    sp500_return = (sp500_cumulative[-1] - 1) * 100
+                                    sp500_vol = sp500_array.std(ddof=1) * SQRT_TRADING_DAYS * 100
                                     
                                     st.markdown("**📊 vs S&P 500 Benchmark**")
                                     col1, col2, col3 = st.columns(3)
@@ -241,27 +293,29 @@ def show_portfolio_simulator():
                             
                             # Stock breakdown
                             st.markdown("**📋 Individual Stock Performance**")
-                            stock_breakdown = []
                             
-                            for ticker, holding in portfolio['stocks'].items():
-                                if ticker in portfolio_returns:
-                                    stock_return = ((1 + portfolio_returns[ticker]).prod() - 1) * 100
-                                    stock_value = portfolio['initial_capital'] * (stock_weights[ticker])
-                                    stock_final_value = stock_value * (1 + stock_return/100)
-                                    
-                                    stock_breakdown.append({
-                                        'Stock': ticker,
-                                        'Company': holding['company_name'],
-                                        'Allocation': f"{holding['allocation_percent']:.1f}%",
-                                        'Initial Value': f"${stock_value:,.0f}",
-                                        'Final Value': f"${stock_final_value:,.0f}",
-                                        'Return': f"{stock_return:+.1f}%",
-                                        'Contribution': f"${stock_final_value - stock_value:+,.0f}"
-                                    })
+                            # Every holding's total return, starting and final value as whole-array operations
+                            stock_returns = stats['stock_returns'] * 100
+                            stock_values = portfolio['initial_capital'] * weights
+                            stock_final_values = stock_values * (1 + stats['stock_returns'])
+                            holdings = [portfolio['stocks'][ticker] for ticker in held_tickers]
+                            
+                            # Built column by column straight from the arrays; no per-row dicts
+                            breakdown_df = pd.DataFrame({
+                                'Stock': held_tickers,
+                                'Company': [holding['company_name'] for holding in holdings],
+                                'Allocation': [f"{holding['allocation_percent']:.1f}%" for holding in holdings],
+                                'Initial Value': [f"${v:,.0f}" for v in stock_values.tolist()],
+                                'Final Value': [f"${v:,.0f}" for v in stock_final_values.tolist()],
+                                'Return': [f"{r:+.1f}%" for r in stock_returns.tolist()],
+                                'Contribution': [f"${v:+,.0f}" for v in (stock_final_values - stock_values).tolist()]
+                            })
+                            st.dataframe(breakdown_df, use_container_width=True)
                             
-                            if stock_breakdown:
-                                breakdown_df = pd.DataFrame(stock_breakdown)
-                                st.dataframe(breakdown_df, use_container_width=True)
+                            # Beta and correlation vs S&P 500; both return series sit on the same joint date grid
+                            beta = correlation = None
+                            if not sp500_returns.empty:
+                                beta, correlation = beta_correlation(weighted, sp500_returns.to_numpy())
                             
                             # Risk metrics
                             st.markdown("**⚠️ Risk Analysis**")
@@ -271,60 +325,28 @@ def show_portfolio_simulator():
                                 st.metric("📉 Max Drawdown", f"{max_drawdown:.1f}%")
                             
                             with col2:
-                                # Calculate beta vs S&P 500
-                                try:
-                                    if '^GSPC' in portfolio_returns:
-                                        sp500_returns = portfolio_returns['^GSPC']
-                                    else:
-                                        sp500_data = data_service.get_historical_data('^GSPC', portfolio['analysis_period'])
-                                        sp500_returns = sp500_data['Close'].pct_change().dropna()
-                                    
-                                    # Align dates
-                                    aligned_data = pd.concat([weighted_returns, sp500_returns], axis=1).dropna()
-                                    if len(aligned_data) > 1:
-                                        covariance = aligned_data.iloc[:, 0].cov(aligned_data.iloc[:, 1])
-                                        sp500_variance = aligned_data.iloc[:, 1].var()
-                                        beta = covariance / sp500_variance if sp500_variance > 0 else 1
-                                        st.metric("📊 Beta", f"{beta:.2f}")
-                                    else:
-                                        st.metric("📊 Beta", "N/A")
-                                except:
-                                    st.metric("📊 Beta", "N/A")
+                                st.metric("📊 Beta", f"{beta:.2f}" if beta is not None else "N/A")
                             
                             with col3:
-                                # Calculate correlation
-                                try:
-                                    if len(aligned_data) > 1:
-                                        correlation = aligned_data.iloc[:, 0].corr(aligned_data.iloc[:, 1])
-                                        st.metric("🔗 Correlation", f"{correlation:.2f}")
-                                    else:
-                                        st.metric("🔗 Correlation", "N/A")
-                                except:
-                                    st.metric("🔗 Correlation", "N/A")
+                                st.metric("🔗 Correlation", f"{correlation:.2f}" if correlation is not None else "N/A")
                             
                             # Export functionality
                             st.markdown("---")
                             st.subheader("📤 Export Analysis")
                             
-                            if st.button("💾 Download Analysis as CSV"):
-                                # Create comprehensive export
-                                export_data = {
-                                    'Metric': ['Initial Investment', 'Final Value', 'Total Return', 'Annualized Return', 
-                                             'Volatility', 'Sharpe Ratio', 'Max Drawdown', 'Beta', 'Correlation'],
-                                    'Value': [portfolio['initial_capital'], final_value, f"{total_return:.2f}%", 
-                                             f"{annualized_return:.2f}%", f"{volatility:.2f}%", f"{sharpe_ratio:.2f}", 
-                                             f"{max_drawdown:.2f}%", f"{beta:.2f}" if 'beta' in locals() else "N/A", 
-                                             f"{correlation:.2f}" if 'correlation' in locals() else "N/A"]
-                                }
-                                
-                                export_df = pd.DataFrame(export_data)
-                                csv = export_df.to_csv(index=False)
-                                st.download_button(
-                                    label="📥 Download CSV",
-                                    data=csv,
-                                    file_name=f"{selected_portfolio}_analysis_{datetime.now().strftime('%Y%m%d')}.csv",
-                                    mime="text/csv"
-                                )
+                            # The download button serves the cached CSV directly, with no extra gate rerun
+                            export_csv = build_analysis_csv((
+                                portfolio['initial_capital'], float(final_value), f"{total_return:.2f}%",
+                                f"{annualized_return:.2f}%", f"{volatility:.2f}%", f"{sharpe_ratio:.2f}",
+                                f"{max_drawdown:.2f}%", f"{beta:.2f}" if beta is not None else "N/A",
+                                f"{correlation:.2f}" if correlation is not None else "N/A"
+                            ))
+                            st.download_button(
+                                label="💾 Download Analysis as CSV",
+                                data=export_csv,
+                                file_name=f"{selected_portfolio}_analysis_{datetime.now().strftime('%Y%m%d')}.csv",
+                                mime="text/csv"
+                            )
                         
                         else:
                             st.error("❌ Could not fetch historical data for portfolio analysis")
@@ -340,13 +362,14 @@ def show_portfolio_simulator():
                 col1, col2 = st.columns([1, 1])
                 with col1:
                     if st.button("🗑️ Delete Portfolio", key=f"delete_{selected_portfolio}"):
-                        del st.session_state.portfolios[selected_portfolio]
+                        store.delete(owner, selected_portfolio)
                         st.success("✅ Portfolio deleted!")
                         st.rerun()
                 
                 with col2:
                     if st.button("🔄 Reset Analysis", key=f"reset_{selected_portfolio}"):
                         portfolio['stocks'] = {}
+                        store.save(owner, selected_portfolio, portfolio)
                         st.success("✅ Portfolio reset!")
                         st.rerun()
             
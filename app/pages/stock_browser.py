@@ -3,14 +3,32 @@ import pandas as pd
 from datetime import datetime
 
 
-from data_service import StockDataService
-from utils.styles import get_custom_css
+from utils.services import get_data_service
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_screening_results(filters):
+    """Display table and CSV export for a sorted tuple of filter items, or None without matches"""
+    # The only cache layer for screening, so each filter set's results are stored once
+    screened_stocks = get_data_service().screen_stocks(dict(filters))
+    if not screened_stocks:
+        return None
+    
+    # Convert to DataFrame for display
+    df = pd.DataFrame(screened_stocks)
+    
+    # Blank out missing values and scale units; number formatting happens in the frontend
+    display_df = df[['ticker', 'company_name', 'current_price', 'price_change_percent',
+                     'market_cap', 'pe_ratio', 'dividend_yield', 'sector']].copy()
+    numeric_cols = ['current_price', 'price_change_percent', 'market_cap', 'pe_ratio', 'dividend_yield']
+    display_df[numeric_cols] = display_df[numeric_cols].where(display_df[numeric_cols] != 0)
+    display_df['market_cap'] /= 1e9
+    display_df['dividend_yield'] *= 100
+    
+    # Export the raw numbers, encoded once so the download button can reuse the bytes
+    return display_df, df.to_csv(index=False).encode()
 
 def show_stock_browser():
     """Stock browser and screening with improved design"""
-    # Apply custom CSS
-    st.markdown(get_custom_css(), unsafe_allow_html=True)
-    
     st.header("🔍 Stock Browser & Screening")
     
     # Screening filters
@@ -51,21 +69,12 @@ def show_stock_browser():
                 filters['max_market_cap'] = max_market_cap
             
             with st.spinner("🔍 Screening stocks..."):
-                data_service = StockDataService()
-                screened_stocks = data_service.screen_stocks(filters)
+                # Sorted items give the same cache key however the filters were built
+                results = get_screening_results(tuple(sorted(filters.items())))
                 
-                if screened_stocks:
-                    st.success(f"✅ Found {len(screened_stocks)} stocks matching criteria")
-                    
-                    # Convert to DataFrame for display
-                    df = pd.DataFrame(screened_stocks)
-                    
-                    # Format columns
-                    df['current_price'] = df['current_price'].apply(lambda x: f"${x:,.2f}" if x else "N/A")
-                    df['price_change_percent'] = df['price_change_percent'].apply(lambda x: f"{x:+.2f}%" if x else "N/A")
-                    df['market_cap'] = df['market_cap'].apply(lambda x: f"${x/1e9:.2f}B" if x else "N/A")
-                    df['pe_ratio'] = df['pe_ratio'].apply(lambda x: f"{x:.2f}" if x else "N/A")
-                    df['dividend_yield'] = df['dividend_yield'].apply(lambda x: f"{x*100:.2f}%" if x else "N/A")
+                if results:
+                    display_df, csv = results
+                    st.success(f"✅ Found {len(display_df)} stocks matching criteria")
                     
                     # Display results in full width below the filters
                     st.markdown("---")
@@ -73,14 +82,19 @@ def show_stock_browser():
                     
                     # Show results in a full-width table
                     st.dataframe(
-                        df[['ticker', 'company_name', 'current_price', 'price_change_percent', 
-                            'market_cap', 'pe_ratio', 'dividend_yield', 'sector']],
+                        display_df,
                         use_container_width=True,
-                        height=400
+                        height=400,
+                        column_config={
+                            'current_price': st.column_config.NumberColumn(format="$%.2f"),
+                            'price_change_percent': st.column_config.NumberColumn(format="%+.2f%%"),
+                            'market_cap': st.column_config.NumberColumn(format="$%.2fB"),
+                            'pe_ratio': st.column_config.NumberColumn(format="%.2f"),
+                            'dividend_yield': st.column_config.NumberColumn(format="%.2f%%")
+                        }
                     )
                     
                     # Add download button for results
-                    csv = df.to_csv(index=False)
                     st.download_button(
                         label="📥 Download Results as CSV",
                         data=csv,
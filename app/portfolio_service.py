@@ -2,28 +2,47 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from data_service import StockDataService
+from data_service import StockDataService, get_stock_data_service
+from utils.metrics import TRADING_DAYS, SQRT_TRADING_DAYS, portfolio_stats, simple_returns
 import json
 
+# Holdings are stored column-wise, one row per ticker
+HOLDING_COLUMNS = {
+    'shares': 'float64',
+    'purchase_price': 'float64',
+    'current_price': 'float64',
+    'value': 'float64',
+    'unrealized_pnl': 'float64',
+    'unrealized_pnl_percent': 'float64',
+    'added_at': 'object'
+}
+
 class PortfolioService:
     """Service for portfolio management and simulation"""
     
-    def __init__(self):
-        self.data_service = StockDataService()
+    def __init__(self, data_service: Optional[StockDataService] = None):
+        # Reuse a caller's service so its caches and fetch pool are shared
+        self.data_service = data_service or get_stock_data_service()
         self.portfolios = {}  # In-memory storage for demo
+        self.sector_cache = {}  # Sectors don't change intraday, so remember them per ticker
     
     def create_portfolio(self, name: str, initial_capital: float = 10000) -> str:
         """Create a new portfolio"""
         portfolio_id = f"portfolio_{len(self.portfolios) + 1}"
+        now = datetime.now().isoformat()
         
         self.portfolios[portfolio_id] = {
             'id': portfolio_id,
             'name': name,
             'initial_capital': initial_capital,
             'current_capital': initial_capital,
-            'holdings': [],
-            'created_at': datetime.now().isoformat(),
-            'last_updated': datetime.now().isoformat()
+            'holdings': pd.DataFrame(
+                {column: pd.Series(dtype=dtype) for column, dtype in HOLDING_COLUMNS.items()},
+                index=pd.Index([], name='ticker', dtype='object')
+            ),
+            'holdings_value': 0.0,  # Running sum of holding values, kept in step by every mutation
+            'created_at': now,
+            'last_updated': now
         }
         
         return portfolio_id
@@ -50,21 +69,30 @@ class PortfolioService:
         if holding_value > portfolio['current_capital']:
             return False
         
-        # Add holding
-        holding = {
-            'ticker': ticker,
-            'shares': shares,
-            'purchase_price': purchase_price,
-            'current_price': current_price,
-            'value': holding_value,
-            'unrealized_pnl': (current_price - purchase_price) * shares,
-            'unrealized_pnl_percent': ((current_price - purchase_price) / purchase_price) * 100,
-            'added_at': datetime.now().isoformat()
-        }
+        # Buying more of a held ticker averages into the existing position
+        holdings = portfolio['holdings']
+        existing = holdings.loc[ticker] if ticker in holdings.index else None
+        if existing is not None:
+            total_shares = existing['shares'] + shares
+            purchase_price = (existing['purchase_price'] * existing['shares'] + purchase_price * shares) / total_shares
+            shares = total_shares
+        
+        # Add holding, stamping it and the portfolio with the same time
+        now = datetime.now().isoformat()
+        value = float(shares * current_price)
+        portfolio['holdings_value'] += value - (existing['value'] if existing is not None else 0)
+        holdings.loc[ticker] = (
+            float(shares),
+            float(purchase_price),
+            float(current_price),
+            value,
+            float((current_price - purchase_price) * shares),
+            float(((current_price - purchase_price) / purchase_price) * 100),
+            existing['added_at'] if existing is not None else now
+        )
         
-        portfolio['holdings'].append(holding)
         portfolio['current_capital'] -= holding_value
-        portfolio['last_updated'] = datetime.now().isoformat()
+        portfolio['last_updated'] = now
         
         return True
     
@@ -75,36 +103,50 @@ class PortfolioService:
         
         portfolio = self.portfolios[portfolio_id]
         
-        # Find and remove holding
-        for i, holding in enumerate(portfolio['holdings']):
-            if holding['ticker'] == ticker:
-                # Return capital
-                portfolio['current_capital'] += holding['value']
-                portfolio['holdings'].pop(i)
-                portfolio['last_updated'] = datetime.now().isoformat()
-                return True
+        holdings = portfolio['holdings']
+        if ticker not in holdings.index:
+            return False
         
-        return False
+        value = holdings.at[ticker, 'value']
+        holdings.drop(index=ticker, inplace=True)
+        
+        # Return capital
+        portfolio['holdings_value'] -= value
+        portfolio['current_capital'] += value
+        portfolio['last_updated'] = datetime.now().isoformat()
+        return True
     
-    def update_portfolio_values(self, portfolio_id: str) -> bool:
-        """Update all holding values with current prices"""
+    def update_portfolio_values(self, portfolio_id: str, quotes: Optional[pd.DataFrame] = None) -> bool:
+        """Update all holding values with current prices, optionally from prefetched bulk quotes"""
         if portfolio_id not in self.portfolios:
             return False
         
         portfolio = self.portfolios[portfolio_id]
-        total_value = portfolio['current_capital']
-        
-        for holding in portfolio['holdings']:
-            # Get current price
-            stock_data = self.data_service.get_stock_data(holding['ticker'])
-            if stock_data and stock_data['current_price'] > 0:
-                current_price = stock_data['current_price']
-                holding['current_price'] = current_price
-                holding['value'] = holding['shares'] * current_price
-                holding['unrealized_pnl'] = (current_price - holding['purchase_price']) * holding['shares']
-                holding['unrealized_pnl_percent'] = ((current_price - holding['purchase_price']) / holding['purchase_price']) * 100
-            
-            total_value += holding['value']
+        holdings = portfolio['holdings']
+        
+        # Price every holding from one batched download instead of a request per ticker
+        if quotes is None:
+            quotes = self.data_service.get_bulk_quotes(holdings.index.tolist())
+        prices = pd.Series(quotes['current_price'].to_numpy(dtype=np.float64), index=quotes['ticker'])
+        self.sector_cache.update(
+            (ticker, sector) for ticker, sector in zip(quotes['ticker'], quotes['sector']) if sector != 'N/A'
+        )
+        
+        # Whole-column arithmetic; unpriced holdings keep their last known price
+        shares = holdings['shares'].to_numpy()
+        purchase = holdings['purchase_price'].to_numpy()
+        quoted = prices.reindex(holdings.index).to_numpy()
+        current = np.where(quoted > 0, quoted, holdings['current_price'].to_numpy())
+        
+        values = shares * current
+        holdings['current_price'] = current
+        holdings['value'] = values
+        holdings['unrealized_pnl'] = (current - purchase) * shares
+        holdings['unrealized_pnl_percent'] = (current - purchase) / purchase * 100
+        
+        # Re-summing here also clears any drift from the incremental updates
+        portfolio['holdings_value'] = float(values.sum())
+        total_value = portfolio['current_capital'] + portfolio['holdings_value']
         
         portfolio['total_value'] = total_value
         portfolio['total_return'] = ((total_value - portfolio['initial_capital']) / portfolio['initial_capital']) * 100
@@ -112,29 +154,31 @@ class PortfolioService:
         
         return True
     
-    def get_portfolio_summary(self, portfolio_id: str) -> Dict:
-        """Get portfolio summary with metrics"""
+    def get_portfolio_summary(self, portfolio_id: str, quotes: Optional[pd.DataFrame] = None,
+                              include_metrics: bool = True) -> Dict:
+        """Get portfolio summary with metrics, optionally from prefetched bulk quotes"""
         if portfolio_id not in self.portfolios:
             return {}
         
         portfolio = self.portfolios[portfolio_id]
         
         # Update values first
-        self.update_portfolio_values(portfolio_id)
+        self.update_portfolio_values(portfolio_id, quotes)
         
         # Calculate metrics
         total_value = portfolio.get('total_value', portfolio['initial_capital'])
         total_return = portfolio.get('total_return', 0)
         
         # Calculate sector allocation
-        sector_allocation = {}
-        for holding in portfolio['holdings']:
-            stock_data = self.data_service.get_stock_data(holding['ticker'])
-            sector = stock_data.get('sector', 'Unknown')
-            sector_allocation[sector] = sector_allocation.get(sector, 0) + holding['value']
+        holdings = portfolio['holdings']
+        sectors = holdings.index.map(self._get_sector)
+        sector_allocation = holdings['value'].groupby(sectors, sort=False).sum().to_dict()
         
         # Calculate portfolio risk metrics
-        risk_metrics = self.data_service.calculate_portfolio_metrics(portfolio['holdings'])
+        risk_metrics = (
+            self.data_service.calculate_portfolio_metrics(holdings.reset_index().to_dict('records'))
+            if include_metrics else {}
+        )
         
         return {
             'id': portfolio_id,
@@ -149,80 +193,87 @@ class PortfolioService:
             'last_updated': portfolio['last_updated']
         }
     
-    def simulate_portfolio(self, portfolio_id: str, months: int = 12) -> Dict:
-        """Simulate portfolio performance over time"""
+    def simulate_portfolio(self, portfolio_id: str, months: int = 12,
+                           prices_df: Optional[pd.DataFrame] = None) -> Dict:
+        """Simulate portfolio performance over time, optionally on preloaded closes"""
         if portfolio_id not in self.portfolios:
             return {}
         
         portfolio = self.portfolios[portfolio_id]
         
         # Get historical data for all holdings
-        simulation_data = {}
-        start_date = datetime.now() - timedelta(days=months * 30)
+        if prices_df is None:
+            prices_df = self._load_closes(portfolio['holdings'].index.tolist(), months)
         
-        for holding in portfolio['holdings']:
-            hist = self.data_service.get_historical_data(holding['ticker'], f"{months}m")
-            if not hist.empty:
-                # Filter to simulation period
-                hist = hist[hist.index >= start_date]
-                if not hist.empty:
-                    simulation_data[holding['ticker']] = hist['Close']
-        
-        if not simulation_data:
+        # Only the dates every holding traded, so a late listing isn't read as flat days
+        portfolio_df = prices_df.dropna()
+        if len(portfolio_df) < 2:
             return {}
         
-        # Create portfolio simulation
-        portfolio_df = pd.DataFrame(simulation_data)
-        
         # Calculate daily returns
-        returns = portfolio_df.pct_change().fillna(0)
-        
-        # Apply portfolio weights
-        weights = [holding['value'] / sum(h['value'] for h in portfolio['holdings']) 
-                  for holding in portfolio['holdings']]
-        
-        portfolio_returns = (returns * weights).sum(axis=1)
+        returns = simple_returns(portfolio_df.to_numpy(dtype=np.float64))
+        
+        # Value weights summed onto their ticker's column; holdings without prices are left out
+        # and the rest reweighted, as calculate_portfolio_metrics does, rather than read as flat
+        holdings = portfolio['holdings']
+        positions = portfolio_df.columns.get_indexer(holdings.index)
+        held = positions >= 0
+        column_weights = np.bincount(
+            positions[held], weights=holdings['value'].to_numpy()[held], minlength=len(portfolio_df.columns)
+        )
+        held_value = column_weights.sum()
+        if held_value <= 0:
+            return {}
+        column_weights /= held_value
         
-        # Calculate cumulative returns
-        cumulative_returns = (1 + portfolio_returns).cumprod()
+        # Return path, growth curve, volatility and drawdown from the shared metrics kernel
+        stats = portfolio_stats(returns, column_weights)
+        cumulative_returns = stats['cumulative']
+        daily_std = stats['volatility']
         
         # Calculate metrics
-        total_return = (cumulative_returns.iloc[-1] - 1) * 100
-        volatility = portfolio_returns.std() * np.sqrt(252) * 100
-        sharpe_ratio = (portfolio_returns.mean() * 252) / portfolio_returns.std() if portfolio_returns.std() > 0 else 0
-        
-        # Calculate drawdown
-        running_max = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - running_max) / running_max
-        max_drawdown = drawdown.min() * 100
+        total_return = stats['total_return'] * 100
+        volatility = daily_std * SQRT_TRADING_DAYS * 100
+        sharpe_ratio = (stats['weighted_returns'].mean() * TRADING_DAYS) / daily_std if daily_std > 0 else 0
+        max_drawdown = stats['max_drawdown'] * 100
         
         return {
             'total_return': total_return,
             'volatility': volatility,
             'sharpe_ratio': sharpe_ratio,
             'max_drawdown': max_drawdown,
-            'cumulative_returns': cumulative_returns.tolist(),
-            'dates': cumulative_returns.index.strftime('%Y-%m-%d').tolist(),
+            # Arrays rather than lists: plotly and pandas take them as-is, without per-point objects
+            'cumulative_returns': cumulative_returns,
+            # One point per return, dated by the close it ends on
+            'dates': portfolio_df.index[1:].to_numpy(),
             'simulation_period': f"{months} months"
         }
     
-    def compare_with_sp500(self, portfolio_id: str) -> Dict:
+    def compare_with_sp500(self, portfolio_id: str, months: int = 12) -> Dict:
         """Compare portfolio performance with S&P 500"""
-        portfolio_sim = self.simulate_portfolio(portfolio_id)
-        if not portfolio_sim:
+        if portfolio_id not in self.portfolios:
+            return {}
+        
+        # Fetch the holdings and the benchmark together and keep only dates the benchmark traded
+        tickers = self.portfolios[portfolio_id]['holdings'].index.tolist()
+        closes = self._load_closes(tickers + ['^GSPC'], months)
+        closes = closes.dropna(axis=1, how='all')
+        if '^GSPC' not in closes:
             return {}
         
-        # Get S&P 500 data
-        sp500_hist = self.data_service.get_historical_data('^GSPC', '1y')
-        if sp500_hist.empty:
+        # Portfolio and benchmark share one dense date grid: the days everything traded
+        closes = closes.dropna()
+        portfolio_sim = self.simulate_portfolio(portfolio_id, months, prices_df=closes.drop(columns='^GSPC'))
+        if not portfolio_sim:
             return {}
         
-        # Calculate S&P 500 returns
-        sp500_returns = sp500_hist['Close'].pct_change().fillna(0)
-        sp500_cumulative = (1 + sp500_returns).cumprod()
+        # Calculate S&P 500 returns on the same date grid
+        sp500_returns = simple_returns(closes['^GSPC'].to_numpy(dtype=np.float64))
+        sp500_std = sp500_returns.std(ddof=1) if len(sp500_returns) > 1 else 0.0
         
-        sp500_total_return = (sp500_cumulative.iloc[-1] - 1) * 100
-        sp500_volatility = sp500_returns.std() * np.sqrt(252) * 100
+        sp500_total_return = np.expm1(np.log1p(sp500_returns).sum()) * 100
+        sp500_volatility = sp500_std * SQRT_TRADING_DAYS * 100
+        sp500_sharpe = (sp500_returns.mean() * TRADING_DAYS) / sp500_std if sp500_std > 0 else 0
         
         return {
             'portfolio': {
@@ -233,15 +284,44 @@ class PortfolioService:
             'sp500': {
                 'total_return': sp500_total_return,
                 'volatility': sp500_volatility,
-                'sharpe_ratio': (sp500_returns.mean() * 252) / sp500_returns.std() if sp500_returns.std() > 0 else 0
+                'sharpe_ratio': sp500_sharpe
             },
             'outperformance': portfolio_sim['total_return'] - sp500_total_return,
-            'risk_adjusted_outperformance': portfolio_sim['sharpe_ratio'] - ((sp500_returns.mean() * 252) / sp500_returns.std() if sp500_returns.std() > 0 else 0)
+            'risk_adjusted_outperformance': portfolio_sim['sharpe_ratio'] - sp500_sharpe
         }
     
-    def get_all_portfolios(self) -> List[Dict]:
-        """Get list of all portfolios"""
-        return [self.get_portfolio_summary(pid) for pid in self.portfolios.keys()]
+    def _load_closes(self, tickers: List[str], months: int) -> pd.DataFrame:
+        """Closing prices over the simulation window, one column per ticker"""
+        start_date = datetime.now() - timedelta(days=months * 30)
+        
+        # One batched download already truncated to the simulation period
+        histories = self.data_service.get_batch_history(tickers, start_date=start_date)
+        closes = pd.DataFrame({ticker: hist['Close'] for ticker, hist in histories.items()})
+        return closes.dropna(how='all')
+    
+    def _get_sector(self, ticker: str) -> str:
+        """Sector for a ticker, fetched only the first time it's needed"""
+        if ticker not in self.sector_cache:
+            stock_data = self.data_service.get_stock_data(ticker)
+            self.sector_cache[ticker] = stock_data.get('sector', 'Unknown')
+        return self.sector_cache[ticker]
+    
+    def get_all_portfolios(self, include_metrics: bool = True) -> List[Dict]:
+        """Get list of all portfolios, with risk metrics unless include_metrics is False"""
+        if not self.portfolios:
+            return []
+        
+        # Price the union of holdings once, then summarize every portfolio from that batch
+        tickers = list(dict.fromkeys(
+            ticker for portfolio in self.portfolios.values() for ticker in portfolio['holdings'].index
+        ))
+        quotes = self.data_service.get_bulk_quotes(tickers)
+        
+        # Load every holding's history in one pooled pass so each portfolio's metrics read warm cache
+        if include_metrics:
+            self.data_service.get_historical_data_many(tickers, "1y")
+        
+        return [self.get_portfolio_summary(pid, quotes, include_metrics) for pid in self.portfolios.keys()]
     
     def delete_portfolio(self, portfolio_id: str) -> bool:
         """Delete a portfolio"""
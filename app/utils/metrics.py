@@ -0,0 +1,48 @@
+import math
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Annualization factors, bound once for every metrics consumer
+TRADING_DAYS = 252
+SQRT_TRADING_DAYS = math.sqrt(TRADING_DAYS)
+
+def max_drawdown(cumulative: np.ndarray) -> float:
+    """Largest peak-to-trough decline of a cumulative growth series, as a fraction"""
+    if len(cumulative) == 0:
+        return 0.0
+    
+    # (c - peak) / peak == c / peak - 1, so divide in place and subtract once at the end
+    ratio = np.maximum.accumulate(cumulative)
+    np.divide(cumulative, ratio, out=ratio)
+    return float(ratio.min() - 1.0)
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Day-over-day returns along axis 0, one row shorter than the prices"""
+    return prices[1:] / prices[:-1] - 1
+
+def portfolio_stats(returns: np.ndarray, weights: np.ndarray) -> Dict:
+    """Weighted return path and headline metrics (as fractions) for a dates x holdings returns matrix"""
+    weighted = returns @ weights
+    cumulative = np.cumprod(1 + weighted)
+    
+    return {
+        'weighted_returns': weighted,
+        'cumulative': cumulative,
+        'total_return': float(np.expm1(np.log1p(weighted).sum())),
+        'stock_returns': np.expm1(np.log1p(returns).sum(axis=0)),
+        'volatility': float(weighted.std(ddof=1)) if len(weighted) > 1 else 0.0,
+        'max_drawdown': max_drawdown(cumulative)
+    }
+
+def beta_correlation(returns: np.ndarray, benchmark: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+    """Beta and correlation of a return series against a same-dated benchmark, None where undefined"""
+    aligned = np.column_stack([returns, benchmark])
+    aligned = aligned[np.isfinite(aligned).all(axis=1)]
+    if len(aligned) < 2:
+        return None, None
+    
+    # Both numbers come from one 2x2 covariance matrix
+    cov = np.cov(aligned, rowvar=False, ddof=1)
+    beta = float(cov[0, 1] / cov[1, 1]) if cov[1, 1] > 0 else 1.0
+    correlation = float(cov[0, 1] / np.sqrt(cov[0, 0] * cov[1, 1])) if cov[0, 0] * cov[1, 1] > 0 else None
+    return beta, correlation
@@ -0,0 +1,91 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from functools import cached_property
+from typing import Dict, List, Optional
+from config import Config
+
+class PortfolioStore:
+    """SQLite-backed scenario storage, scoped per owner so one visitor's portfolios stay out of other sessions"""
+    
+    def __init__(self, path: str = Config.PORTFOLIO_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    @cached_property
+    def _conn(self) -> sqlite3.Connection:
+        """Open the database on first query; callers already hold the lock"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # One connection shared across script threads, serialized by the lock
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS portfolios ("
+                "owner TEXT NOT NULL, name TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (owner, name))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, last_seen REAL NOT NULL)")
+        return conn
+    
+    def list_names(self, owner: str) -> List[str]:
+        """Scenario names for an owner, oldest first"""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT name FROM portfolios WHERE owner = ? ORDER BY rowid", (owner,)
+                ).fetchall()
+            return [name for (name,) in rows]
+        except Exception as e:
+            print(f"Error listing portfolios: {e}")
+            return []
+    
+    def load(self, owner: str, name: str) -> Optional[Dict]:
+        """Load a single scenario, or None if it doesn't exist"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT data FROM portfolios WHERE owner = ? AND name = ?", (owner, name)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            print(f"Error loading portfolio {name}: {e}")
+            return None
+    
+    def save(self, owner: str, name: str, portfolio: Dict):
+        """Insert or replace a scenario, then prune session-scoped owners that have gone quiet"""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO portfolios (owner, name, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(owner, name) DO UPDATE SET data = excluded.data",
+                    (owner, name, json.dumps(portfolio))
+                )
+                self._conn.execute(
+                    "INSERT INTO owners (owner, last_seen) VALUES (?, ?) "
+                    "ON CONFLICT(owner) DO UPDATE SET last_seen = excluded.last_seen",
+                    (owner, now)
+                )
+                
+                # A signed-out session's key can't be recovered once it ends, so its rows would otherwise pile up
+                cutoff = now - Config.SESSION_PORTFOLIO_TTL
+                self._conn.execute(
+                    "DELETE FROM portfolios WHERE owner IN "
+                    "(SELECT owner FROM owners WHERE owner LIKE 'session:%' AND last_seen < ?)", (cutoff,)
+                )
+                self._conn.execute("DELETE FROM owners WHERE owner LIKE 'session:%' AND last_seen < ?", (cutoff,))
+        except Exception as e:
+            print(f"Error saving portfolio {name}: {e}")
+    
+    def delete(self, owner: str, name: str):
+        """Remove a scenario"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM portfolios WHERE owner = ? AND name = ?", (owner, name))
+        except Exception as e:
+            print(f"Error deleting portfolio {name}: {e}")
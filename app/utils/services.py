@@ -0,0 +1,47 @@
+import streamlit as st
+import pandas as pd
+from typing import Dict, Tuple
+
+from data_service import StockDataService, get_stock_data_service
+from utils.portfolio_store import PortfolioStore
+
+@st.cache_resource
+def get_data_service() -> StockDataService:
+    """Single StockDataService shared across reruns so its caches stay warm"""
+    return get_stock_data_service()
+
+@st.cache_resource
+def get_portfolio_store() -> PortfolioStore:
+    """Single PortfolioStore so the SQLite connection is opened once per process"""
+    return PortfolioStore()
+
+@st.cache_data(ttl=60)
+def cached_market_overview() -> Dict:
+    """Market overview reused across reruns for up to a minute"""
+    return get_data_service().get_market_overview()
+
+@st.cache_data(ttl=60)
+def cached_stock_data(ticker: str) -> Dict:
+    """Stock data reused across reruns for up to a minute"""
+    return get_data_service().get_stock_data(ticker)
+
+@st.cache_data(ttl=60)
+def cached_stock_data_many(tickers: Tuple[str, ...]) -> Dict[str, Dict]:
+    """Concurrently fetched stock data reused across reruns for up to a minute"""
+    return get_data_service().get_stock_data_many(list(tickers))
+
+@st.cache_data(ttl=60)
+def cached_bulk_quotes(tickers: Tuple[str, ...]) -> pd.DataFrame:
+    """Batch-downloaded quotes reused across reruns for up to a minute"""
+    return get_data_service().get_bulk_quotes(list(tickers))
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_historical_data(ticker: str, period: str) -> pd.DataFrame:
+    """Price history with indicators reused across reruns for up to an hour"""
+    return get_data_service().get_historical_data(ticker, period)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_batch_closes(tickers: Tuple[str, ...], period: str) -> pd.DataFrame:
+    """Closing prices on one shared date index from batched downloads, reused for up to an hour"""
+    histories = get_data_service().get_batch_history(list(tickers), period=period)
+    return pd.DataFrame({ticker: hist['Close'] for ticker, hist in histories.items()})
@@ -1,7 +1,18 @@
-def get_custom_css():
-    """Return custom CSS styles for the dashboard"""
-    return """
+import re
+
+# Built once at import; every page shares the same stylesheet string
+CUSTOM_CSS = """
     <style>
+        /* Hide the Streamlit chrome */
+        #MainMenu {visibility: hidden;}
+        footer {visibility: hidden;}
+        header {visibility: hidden;}
+        .stDeployButton {display: none;}
+        .stApp > header {display: none;}
+        .stApp > footer {display: none;}
+        .stApp > div[data-testid="stToolbar"] {display: none;}
+        .stApp > div[data-testid="stDecoration"] {display: none;}
+        
         .main-header {
             font-size: 2.5rem;
             font-weight: bold;
@@ -49,6 +60,18 @@ def get_custom_css():
             margin: 0.5rem 0;
         }
         
+        .mover-grid {
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 1rem;
+        }
+        
+        .sector-grid {
+            display: grid;
+            grid-template-columns: repeat(3, 1fr);
+            gap: 1rem;
+        }
+        
         .mover-card {
             background: linear-gradient(135deg, #1E1E1E 0%, #2D2D2D 100%);
             padding: 1rem;
@@ -127,3 +150,16 @@ def get_custom_css():
         }
     </style>
     """
+
+def _minify(css: str) -> str:
+    """Drop comments and layout whitespace so each rerun ships the smallest style element"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).strip()
+
+# The stylesheet has to be re-emitted on every rerun, so keep the payload minimal
+CUSTOM_CSS = _minify(CUSTOM_CSS)
+
+def get_custom_css():
+    """Return custom CSS styles for the dashboard"""
+    return CUSTOM_CSS
@@ -3,7 +3,6 @@
 Simple startup script for the Stock/ETF Dashboard
 """
 
-import subprocess
 import sys
 import os
 
@@ -16,6 +15,9 @@ def main():
         print("   Current directory:", os.getcwd())
         sys.exit(1)
     
+    # Only pay for the launcher import once the directory check has passed
+    import subprocess
+    
     # Change to app directory and start
     os.chdir("app")
     print("✅ Starting dashboard on http://localhost:8501")